@@ -1,93 +1,189 @@
+import ast
+import json
+import logging
 import networkx as nx
-from typing import List, Dict, Any
+from collections import defaultdict
+from sys import intern
+from typing import List, Dict, Any, BinaryIO, Iterable, Iterator, Optional, Tuple
 
-from codebase.code_graph.models import GraphNode, GraphEdge
+from codebase.code_graph.models import GraphNode, GraphEdge, NodeBatch, EDGE_TYPE_VALUES
+from codebase.code_parser.visitor import CodeVisitor
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # optional speedup for to_json
+    orjson = None
+
+
+def _score(node_id: str, node_data: Dict[str, Any]) -> Tuple[int, str]:
+    """Sort key for picking the canonical node among same-named ones (lowest wins)."""
+    metadata = node_data.get("metadata") or {}
+    return (0 if metadata.get("source_file") else 1, node_id.partition(":")[2])
 
 
 class CodeGraph:
     def __init__(self):
         self.graph = nx.DiGraph()
+        # Reference index kept up to date on insertion so that merging does not
+        # need a grouping pass over every node: simple name -> node ids, and
+        # node id -> precomputed canonical score.
+        self._by_name: Dict[str, List[str]] = defaultdict(list)
+        self._score: Dict[str, Tuple[int, str]] = {}
+
+    def _index_node(self, node_id: str, node_data: Dict[str, Any]) -> None:
+        """Records a node in the reference index used by merge_nodes_by_reference."""
+        name = node_data.get("name")
+        if not name:
+            return
+        if node_id not in self._score:
+            self._by_name[name].append(node_id)
+        self._score[node_id] = _score(node_id, node_data)
+
+    def add_node_data(self, node_id: str, node_data: Dict[str, Any]) -> None:
+        """Adds a node from its already serialized data."""
+        self.graph.add_node(node_id, data=node_data)
+        self._index_node(node_id, node_data)
 
     def add_node(self, node: GraphNode) -> None:
         """Adds a node to the NetworkX graph."""
-        node_data = node.model_dump(exclude_none=True)
-        node_data["node_type"] = node.node_type.value
-
-        for rel in node_data.get("relationships", []):
-            rel["edge_type"] = rel["edge_type"].value
+        self.add_node_data(node.id, node.to_graph_data())
+
+    def _new_edges(self, edges: Iterable[Tuple[str, str, str]]) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+        """
+        Filters (source, target, relationship) triples down to those not already in
+        the graph with the same relationship. Must be consumed one edge at a time by
+        add_edges_from so that earlier edges are visible to later ones.
+        """
+        adj = self.graph.adj
+        for u, v, rel in edges:
+            # A DiGraph holds one edge per pair; a new relationship replaces the old.
+            existing = adj[u].get(v) if u in adj else None
+            if existing is not None and existing.get("relationship") == rel:
+                continue
+            yield u, v, {"relationship": rel}
 
-        self.graph.add_node(node.id, data=node_data)
+    def add_edges_data(self, edges: Iterable[Tuple[str, str, str]]) -> None:
+        """Adds (source, target, relationship) edges, skipping exact duplicates."""
+        self.graph.add_edges_from(self._new_edges(edges))
 
     def add_edge(self, source_id: str, edge: GraphEdge) -> None:
         """Adds an edge between two nodes in the graph."""
-        self.graph.add_edge(source_id, edge.target_node_id, relationship=edge.edge_type.value)
+        self.add_edges_data([(source_id, edge.target_node_id, EDGE_TYPE_VALUES[edge.edge_type])])
 
     def build_from_nodes(self, nodes: List[GraphNode]) -> None:
         """Builds a graph structure from a list of GraphNodes."""
-        for node in nodes:
-            self.add_node(node)
-        for node in nodes:
-            for edge in node.relationships:
-                self.add_edge(node.id, edge)
+        self.build_from_batch(NodeBatch.from_nodes(nodes))
+
+    def build_from_batch(self, batch: NodeBatch) -> None:
+        """Builds a graph structure from a NodeBatch."""
+        # Ids and relationship labels are interned here as well as in the model
+        # factories: batches coming back from worker processes are unpickled into
+        # fresh, non-interned strings.
+        ids = [intern(node_id) for node_id in batch.ids]
+        self.graph.add_nodes_from(zip(ids, ({"data": node_data} for node_data in batch.node_data)))
+        for node_id, node_data in zip(ids, batch.node_data):
+            self._index_node(node_id, node_data)
+        self.add_edges_data((intern(u), intern(v), intern(rel)) for u, v, rel in batch.edges)
+
+    def build_from_code(self, source_file: str, code: str, project_root: str = "") -> "CodeGraph":
+        """Parses one module's source with CodeVisitor and adds its nodes to this graph."""
+        tree = ast.parse(code, filename=source_file)
+        visitor = CodeVisitor(source_file=source_file, code=code, project_root=project_root, tree=tree)
+        visitor.visit(tree)
+        self.build_from_batch(visitor.get_graph_batch())
+        return self
 
     def get_networkx_graph(self) -> nx.DiGraph:
         """Returns the NetworkX DiGraph representation."""
         return self.graph
 
     def to_dict(self) -> Dict[str, Any]:
-        """Serializes the graph to a dictionary format."""
-        return nx.node_link_data(self.graph)
+        """
+        Serializes the graph to a node-link dictionary.
+
+        Same layout as ``nx.node_link_data`` (with ``edges="links"``), but node and edge
+        attribute dicts are referenced rather than copied.
+        """
+        return {
+            "directed": True,
+            "multigraph": False,
+            "graph": self.graph.graph,
+            "nodes": [{"id": node_id, **attrs} for node_id, attrs in self.graph.nodes(data=True)],
+            "links": [{"source": u, "target": v, **attrs} for u, v, attrs in self.graph.edges(data=True)],
+        }
+
+    def to_json(self, fp: Optional[BinaryIO] = None) -> Optional[bytes]:
+        """
+        Serializes the graph to node-link JSON, using orjson when it is installed.
+
+        Returns the JSON as bytes, or, given a binary file object ``fp``, streams it
+        there one node or link at a time (same document) and returns None, so the
+        whole graph is never held as a single dict or bytes object.
+        """
+        if fp is None:
+            data = self.to_dict()
+            if orjson is not None:
+                return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            return json.dumps(data).encode("utf-8")
+
+        if orjson is not None:
+            def dumps(value: Any) -> bytes:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+            sep, colon = b",", b":"
+        else:
+            def dumps(value: Any) -> bytes:
+                return json.dumps(value).encode("utf-8")
+            sep, colon = b", ", b": "
+
+        def write_rows(key: str, rows: Iterable[Dict[str, Any]]) -> None:
+            fp.write(sep + dumps(key) + colon + b"[")
+            for i, row in enumerate(rows):
+                if i:
+                    fp.write(sep)
+                fp.write(dumps(row))
+            fp.write(b"]")
+
+        fp.write(b"{" + dumps("directed") + colon + b"true" + sep + dumps("multigraph") + colon + b"false")
+        fp.write(sep + dumps("graph") + colon + dumps(self.graph.graph))
+        write_rows("nodes", ({"id": node_id, **attrs} for node_id, attrs in self.graph.nodes(data=True)))
+        write_rows("links", ({"source": u, "target": v, **attrs} for u, v, attrs in self.graph.edges(data=True)))
+        fp.write(b"}")
+        return None
 
     def merge_nodes_by_reference(self) -> None:
         """Merges nodes that reference the same entity in the graph."""
-        simple_to_ids: Dict[str, List[str]] = {}
-
-        # Group nodes by simple name
-        for node_id, attr in self.graph.nodes(data=True):
-            name = attr.get("data", {}).get("name")
-            if name:
-                simple_to_ids.setdefault(name, []).append(node_id)
-
+        debug = logger.isEnabledFor(logging.DEBUG)
         # Merge nodes based on reference similarity
-        for name, ids in simple_to_ids.items():
+        for name, ids in self._by_name.items():
+            ids = [nid for nid in ids if nid in self.graph]
             if len(ids) <= 1:
                 continue
 
-            def score(nid: str):
-                data = self.graph.nodes[nid]["data"]
-                has_source_file = 1 if data.get("metadata", {}).get("source_file") else 0
-                pkg = nid.split(":", 1)[1]  # Extract package path
-                return (-has_source_file, pkg)
-
-            canonical = min(ids, key=score)
-            print(f"[merge_nodes_by_reference] Canonical for '{name}': {canonical}")
+            canonical = min(ids, key=self._score.__getitem__)
+            if debug:
+                logger.debug("[merge_nodes_by_reference] Canonical for '%s': %s", name, canonical)
 
             # Redirect edges and remove redundant nodes
             for nid in ids:
                 if nid == canonical:
                     continue
 
-                if nid not in self.graph:
-                    print(f"[merge_nodes_by_reference] Skipping '{nid}', as it does not exist in the graph.")
-                    continue
-
                 edges_to_add = []
-                edges_to_remove = []
-
-                for u, v, d in list(self.graph.edges(data=True)):
-                    if v == nid and self.graph.has_node(u):
-                        if not self.graph.has_edge(u, canonical):
-                            edges_to_add.append((u, canonical, d))
-                        edges_to_remove.append((u, v))
-                    if u == nid and self.graph.has_node(v):
-                        if not self.graph.has_edge(canonical, v):
-                            edges_to_add.append((canonical, v, d))
-                        edges_to_remove.append((u, v))
-
-                for u, v, d in edges_to_add:
-                    self.graph.add_edge(u, v, **d)
-                for u, v in edges_to_remove:
-                    if self.graph.has_edge(u, v):
-                        self.graph.remove_edge(u, v)
-                if self.graph.has_node(nid):
-                    self.graph.remove_node(nid)
+
+                # Only the edges incident to the duplicate need redirecting; the
+                # adjacency views answer this in O(deg(nid)) instead of O(E).
+                for u, _, d in self.graph.in_edges(nid, data=True):
+                    if u != nid and not self.graph.has_edge(u, canonical):
+                        edges_to_add.append((u, canonical, d.get("relationship")))
+                for _, v, d in self.graph.out_edges(nid, data=True):
+                    if v != nid and not self.graph.has_edge(canonical, v):
+                        edges_to_add.append((canonical, v, d.get("relationship")))
+
+                # remove_node drops every incident edge of the duplicate as well.
+                self.graph.remove_node(nid)
+                del self._score[nid]
+                self.add_edges_data(edges_to_add)
+
+            self._by_name[name] = [canonical]
@@ -1,6 +1,8 @@
+from dataclasses import dataclass, field, fields
 from enum import StrEnum
+from sys import intern
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, FrozenSet, Iterable, Optional, Tuple
 
 
 # ---------------------------------------------------------------------------
@@ -26,12 +28,19 @@ class EdgeType(StrEnum):
     DECORATES = "decorates"
 
 
+# Plain-string views of the enum values. ``StrEnum.value`` is a descriptor lookup
+# on every access, which adds up on the graph construction path; a dict probe is
+# several times cheaper.
+NODE_TYPE_VALUES: Dict[NodeType, str] = {member: member.value for member in NodeType}
+EDGE_TYPE_VALUES: Dict[EdgeType, str] = {member: member.value for member in EdgeType}
+
+
 # ---------------------------------------------------------------------------
 # Validation Rules for Correct Edge Directions
 # ---------------------------------------------------------------------------
 
-VALID_EDGES: Dict[EdgeType, List[Tuple[NodeType, NodeType]]] = {
-    EdgeType.CONTAINS: [
+VALID_EDGES: Dict[EdgeType, FrozenSet[Tuple[NodeType, NodeType]]] = {
+    EdgeType.CONTAINS: frozenset({
         (NodeType.PACKAGE, NodeType.MODULE),
         (NodeType.MODULE, NodeType.CLASS),
         (NodeType.MODULE, NodeType.FUNCTION),
@@ -40,56 +49,100 @@ VALID_EDGES: Dict[EdgeType, List[Tuple[NodeType, NodeType]]] = {
         (NodeType.CLASS, NodeType.VARIABLE),
         (NodeType.FUNCTION, NodeType.FUNCTION),  # Allow nested functions
         (NodeType.FUNCTION, NodeType.CLASS),  # Allow functions to contain classes
-    ],
-    EdgeType.IMPORTS: [
+    }),
+    EdgeType.IMPORTS: frozenset({
         (NodeType.MODULE, NodeType.MODULE),
         (NodeType.PACKAGE, NodeType.PACKAGE),
-    ],
-    EdgeType.INHERITS: [
+    }),
+    EdgeType.INHERITS: frozenset({
         (NodeType.CLASS, NodeType.CLASS),
-    ],
-    EdgeType.COMPOSES: [
+    }),
+    EdgeType.COMPOSES: frozenset({
         (NodeType.CLASS, NodeType.CLASS),
         (NodeType.CLASS, NodeType.FUNCTION),
         (NodeType.CLASS, NodeType.VARIABLE),
-    ],
-    EdgeType.CALLS: [
+    }),
+    EdgeType.CALLS: frozenset({
         (NodeType.FUNCTION, NodeType.FUNCTION),
         (NodeType.FUNCTION, NodeType.CLASS),
-    ],
-    EdgeType.REFERENCES: [
+    }),
+    EdgeType.REFERENCES: frozenset({
         (NodeType.FUNCTION, NodeType.VARIABLE),
         (NodeType.CLASS, NodeType.VARIABLE),
-    ],
+    }),
     # Updated DECORATES rule:
-    EdgeType.DECORATES: [
+    EdgeType.DECORATES: frozenset({
         (NodeType.FUNCTION, NodeType.FUNCTION),
         (NodeType.FUNCTION, NodeType.CLASS),
         (NodeType.CLASS, NodeType.FUNCTION),
         (NodeType.CLASS, NodeType.CLASS),
-    ],
+    }),
 }
 
+_NO_EDGES: FrozenSet[Tuple[NodeType, NodeType]] = frozenset()
+
+
+# When enabled, the ``fast`` factories below still run edge direction validation.
+# Leave off in production: the visitor only produces statically valid edges.
+DEBUG_VALIDATION: bool = False
+
+_object_setattr = object.__setattr__
+
+
+def _construct(model_cls: type[BaseModel], data: Dict[str, Any]) -> Any:
+    """
+    Creates a model instance from a complete, already typed field dict.
+
+    This is what ``BaseModel.model_construct`` ends up doing, minus its per-field
+    alias/default resolution loop, which costs more than validation itself. Callers
+    must pass every field.
+    """
+    instance = model_cls.__new__(model_cls)
+    _object_setattr(instance, "__dict__", data)
+    _object_setattr(instance, "__pydantic_fields_set__", set(data))
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
+
 
 # ---------------------------------------------------------------------------
 # Metadata Model
 # ---------------------------------------------------------------------------
 
 
-class Metadata(BaseModel):
-    source_file: Optional[str] = Field(default=None, description="The source file path.")
-    line_start: Optional[int] = Field(default=None, description="Start line number.")
-    line_end: Optional[int] = Field(default=None, description="End line number.")
-    docstring: Optional[str] = Field(default=None, description="Docstring of the element.")
-    type_hint: Optional[str] = Field(default=None, description="Type hint if any.")
+@dataclass(slots=True)
+class Metadata:
+    """
+    Optional node metadata.
+
+    A slotted dataclass rather than a Pydantic model: every graph node carries one,
+    and dropping the per-instance ``__dict__`` and Pydantic bookkeeping attributes
+    noticeably shrinks large graphs.
+    """
+    source_file: Optional[str] = None  # The source file path.
+    line_start: Optional[int] = None  # Start line number.
+    line_end: Optional[int] = None  # End line number.
+    docstring: Optional[str] = None  # Docstring of the element.
+    type_hint: Optional[str] = None  # Type hint if any.
     # New fields to capture additional information from the enhanced CodeVisitor:
-    base_classes: List[str] = Field(default_factory=list, description="List of base classes (for class nodes).")
-    decorators: List[str] = Field(default_factory=list, description="List of decorators applied to this element.")
+    base_classes: List[str] = field(default_factory=list)  # Base classes (for class nodes).
+    decorators: List[str] = field(default_factory=list)  # Decorators applied to this element.
     # Optional embedding vector for semantic search purposes.
-    embedding_vector: List[float] = Field(
-        default_factory=list, description="Embedding vector representing the semantic meaning of the component."
-    )
-    additional: Dict[str, Any] = Field(default_factory=dict, description="Any extra metadata.")
+    embedding_vector: List[float] = field(default_factory=list)
+    additional: Dict[str, Any] = field(default_factory=dict)  # Any extra metadata.
+
+    def to_dict(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """Returns the fields as a dict, like ``model_dump`` on the former model."""
+        if exclude_none:
+            return {
+                name: value
+                for name in _METADATA_FIELDS
+                if (value := getattr(self, name)) is not None
+            }
+        return {name: getattr(self, name) for name in _METADATA_FIELDS}
+
+
+_METADATA_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(Metadata))
 
 
 # ---------------------------------------------------------------------------
@@ -105,7 +158,7 @@ class GraphEdge(BaseModel):
     @classmethod
     def validate_edge(cls, edge_type: EdgeType, source_type: NodeType, target_type: NodeType):
         """Ensure the edge is valid according to predefined direction rules."""
-        if (source_type, target_type) not in VALID_EDGES.get(edge_type, []):
+        if (source_type, target_type) not in VALID_EDGES.get(edge_type, _NO_EDGES):
             raise ValueError(f"Invalid edge direction: {source_type} --({edge_type})--> {target_type}")
 
     def __init__(self, **data):
@@ -113,6 +166,18 @@ class GraphEdge(BaseModel):
         super().__init__(**data)
         self.validate_edge(self.edge_type, self.source_node_type, self.target_node_type)
 
+    @classmethod
+    def fast(cls, **data) -> "GraphEdge":
+        """
+        Builds an edge from trusted, already typed data without Pydantic validation.
+        Direction rules are only checked when DEBUG_VALIDATION is set.
+        """
+        if DEBUG_VALIDATION:
+            cls.validate_edge(data["edge_type"], data["source_node_type"], data["target_node_type"])
+        data["source_node_id"] = intern(data["source_node_id"])
+        data["target_node_id"] = intern(data["target_node_id"])
+        return _construct(cls, data)
+
 
 # ---------------------------------------------------------------------------
 # GraphNode Model
@@ -126,12 +191,77 @@ class GraphNode(BaseModel):
     metadata: Metadata = Field(default_factory=Metadata, description="Optional node metadata.")
     relationships: List[GraphEdge] = Field(default_factory=list, description="List of relationship edges.")
 
+    @classmethod
+    def fast(cls, **data) -> "GraphNode":
+        """Builds a node from trusted, already typed data without Pydantic validation."""
+        data["id"] = intern(data["id"])
+        data["name"] = intern(data["name"])
+        if "metadata" not in data:
+            data["metadata"] = Metadata()
+        if "relationships" not in data:
+            data["relationships"] = []
+        return _construct(cls, data)
+
     def add_relationship(self, edge: GraphEdge):
         """Ensure relationships only contain valid edges."""
         if edge.source_node_id != self.id:
             raise ValueError("The source node ID must match the current node's ID.")
         self.relationships.append(edge)
 
+    def to_graph_data(self) -> Dict[str, Any]:
+        """
+        Builds the attribute dict stored on the NetworkX node.
+
+        Equivalent to ``model_dump(exclude_none=True)`` with enums resolved to their
+        string values, but assembled directly instead of going through Pydantic's
+        serializer.
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "node_type": NODE_TYPE_VALUES[self.node_type],
+            "metadata": self.metadata.to_dict(exclude_none=True),
+            "relationships": [
+                {
+                    "edge_type": EDGE_TYPE_VALUES[rel.edge_type],
+                    "source_node_id": rel.source_node_id,
+                    "target_node_id": rel.target_node_id,
+                    "source_node_type": NODE_TYPE_VALUES[rel.source_node_type],
+                    "target_node_type": NODE_TYPE_VALUES[rel.target_node_type],
+                }
+                for rel in self.relationships
+            ],
+        }
+
+
+# ---------------------------------------------------------------------------
+# NodeBatch
+# ---------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class NodeBatch:
+    """
+    Column-oriented form of a list of GraphNodes, ready to be added to a CodeGraph.
+
+    ``node_data[i]`` is ``to_graph_data()`` of the node with id ``ids[i]``; ``edges`` holds
+    every relationship as a ``(source_id, target_id, edge_type value)`` triple.
+    """
+    ids: List[str] = field(default_factory=list)
+    node_data: List[Dict[str, Any]] = field(default_factory=list)
+    edges: List[Tuple[str, str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[GraphNode]) -> "NodeBatch":
+        batch = cls()
+        for node in nodes:
+            batch.ids.append(node.id)
+            batch.node_data.append(node.to_graph_data())
+            batch.edges.extend(
+                (node.id, rel.target_node_id, EDGE_TYPE_VALUES[rel.edge_type]) for rel in node.relationships
+            )
+        return batch
+
 
 # ---------------------------------------------------------------------------
 # Example Usage & Testing
@@ -0,0 +1,120 @@
+"""
+parse_cache.py
+==============
+
+This module provides ParseCache, an on-disk cache of per-file parse results used by
+build_project_graph to skip files that have not changed since the previous run.
+Entries are keyed by the file path as build_project_graph passes it (relative when the
+project path is) and validated against the file's mtime and size, falling back to a
+hash of the file's content when the stat no longer matches.
+"""
+
+
+import hashlib
+import os
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from codebase.code_graph.models import NodeBatch
+
+
+# Default cache location; one database per project root below it.
+PARSE_CACHE_DIR = Path.home() / ".cache" / "codebase"
+
+# Bump whenever the visitor output changes shape, so stale entries are not reused.
+PARSE_CACHE_VERSION = 3
+
+
+class ParseCache:
+    """SQLite-backed cache of NodeBatch results for the files of one project.
+
+    A file's cached batch is reused while its (mtime_ns, size) stat pair is
+    unchanged. When only the stat differs (e.g. after a checkout or touch), the
+    SHA-256 of the file's content is compared instead and, on a match, the entry's
+    stat is refreshed so the next lookup is a plain stat hit again. Results that
+    depend on other files (e.g. resolved import targets) are not invalidated when
+    only those other files change.
+    """
+
+    def __init__(self, project_root: str, cache_dir: Optional[Path] = None):
+        """
+        Opens (creating if needed) the cache database for a project.
+
+        Args:
+            project_root (str): Root directory of the project being parsed.
+            cache_dir (Optional[Path], optional): Base cache directory. Defaults to PARSE_CACHE_DIR.
+        """
+        project_key = hashlib.sha1(os.path.abspath(project_root).encode("utf-8")).hexdigest()[:16]
+        db_dir = (cache_dir or PARSE_CACHE_DIR) / project_key
+        db_dir.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_dir / f"index-v{PARSE_CACHE_VERSION}.sqlite")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files "
+            "(path TEXT PRIMARY KEY, mtime INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "digest BLOB NOT NULL, blob BLOB NOT NULL)"
+        )
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._digests: Dict[str, bytes] = {}
+
+    def _stat(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        self._stats[path] = (st.st_mtime_ns, st.st_size)
+        return self._stats[path]
+
+    def _digest(self, path: str) -> Optional[bytes]:
+        if path not in self._digests:
+            try:
+                with open(path, "rb") as f:
+                    self._digests[path] = hashlib.file_digest(f, "sha256").digest()
+            except OSError:
+                return None
+        return self._digests[path]
+
+    def load(self, paths: Iterable[str]) -> Dict[str, Optional[NodeBatch]]:
+        """
+        Returns the cached results of every path whose stat, or failing that whose
+        content hash, still matches its entry.
+
+        Args:
+            paths (Iterable[str]): File paths to look up.
+
+        Returns:
+            Dict[str, Optional[NodeBatch]]: Cached results (None for files that were skipped).
+        """
+        hits = {}
+        for path in paths:
+            stat = self._stat(path)
+            if stat is None:
+                continue
+            row = self.conn.execute("SELECT mtime, size, digest, blob FROM files WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                continue
+            mtime, size, digest, blob = row
+            if (mtime, size) != stat:
+                # Same size is a precondition for same content; only then is hashing worth it.
+                if size != stat[1] or self._digest(path) != digest:
+                    continue
+                self.conn.execute("UPDATE files SET mtime = ? WHERE path = ?", (stat[0], path))
+            hits[path] = pickle.loads(blob)
+        return hits
+
+    def store(self, path: str, batch: Optional[NodeBatch]) -> None:
+        """Records the parse result of a file against the stat taken by load()."""
+        stat = self._stats.get(path) or self._stat(path)
+        digest = self._digest(path)
+        if stat is None or digest is None:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime, size, digest, blob) VALUES (?, ?, ?, ?, ?)",
+            (path, *stat, digest, pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+
+    def close(self) -> None:
+        """Commits pending entries and closes the database."""
+        self.conn.commit()
+        self.conn.close()
@@ -1,82 +1,192 @@
 import ast
 import logging
+import mmap
 import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, TextIO
 
 import networkx as nx
-import matplotlib.pyplot as plt
-from neo4j import GraphDatabase
 
 from codebase.code_graph.graph import CodeGraph
+from codebase.code_graph.models import EdgeType, NodeBatch
+from codebase.code_graph.parse_cache import ParseCache
 from codebase.code_parser.visitor import CodeVisitor
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows sent per UNWIND query by dump_graph_to_neo4j.
+NEO4J_BATCH_SIZE = 10_000
+
+# Smallest number of files build_project_graph hands to a process pool.
+PARALLEL_MIN_FILES = 4
+
+# Directory names build_project_graph never descends into (besides hidden directories).
+SKIPPED_DIR_NAMES = frozenset({"__pycache__"})
+
+# Source files from this size on are memory-mapped for parsing; smaller ones are read,
+# which costs fewer syscalls than setting up and tearing down a mapping.
+MMAP_MIN_SIZE = 64 * 1024
+
+# Seed for visualize_graph's spring layout, so the same graph is always drawn the same way.
+VISUALIZE_LAYOUT_SEED = 0
+
+# Above this many edges visualize_graph draws edges as one LineCollection without
+# arrow heads or relationship labels; per-edge arrow patches and label texts dominate
+# the drawing time of larger graphs.
+VISUALIZE_DETAIL_MAX_EDGES = 500
+
+# Label shared by every dumped node (next to its node type label), so edge endpoints
+# can be matched through a single id index whatever their type.
+NEO4J_NODE_LABEL = "CodeNode"
+
+_CREATE_ID_INDEX_QUERY = f"CREATE INDEX code_node_id IF NOT EXISTS FOR (n:{NEO4J_NODE_LABEL}) ON (n.id)"
+
+# One edge-creation query per known relationship type. Relationship types cannot be
+# passed as Cypher parameters, so only EdgeType values are ever formatted into a
+# query, and each query text is built once so Neo4j can reuse its cached plan.
+_CREATE_EDGE_QUERIES: Dict[str, str] = {
+    edge_type.value: f"""
+    UNWIND $rows AS row
+    MATCH (a:{NEO4J_NODE_LABEL} {{id: row.source_id}}), (b:{NEO4J_NODE_LABEL} {{id: row.target_id}})
+    MERGE (a)-[r:{edge_type.value.upper()}]->(b)
+    """
+    for edge_type in EdgeType
+}
+
 
 # ---------------------------------------------------------------------------
 # Helper Functions (formerly in helpers.py)
 # ---------------------------------------------------------------------------
-def visualize_graph(graph: nx.DiGraph) -> None:
+def _dot_quote(value: Any) -> str:
+    """Quotes a value as a DOT ID string."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def write_graph_dot(graph: nx.DiGraph, out: TextIO) -> None:
+    """
+    Writes a NetworkX graph as GraphViz DOT, one line per node and edge, labelled the
+    same way as visualize_graph. Runs in a single O(V + E) pass with no layout step,
+    so it also works for graphs far too large to plot; render with e.g. ``dot -Tsvg``.
+    """
+    out.write("digraph code_graph {\n")
+    for node, attr in graph.nodes(data=True):
+        data = attr.get("data", {})
+        label = f"{data.get('node_type')}\n{data.get('name')}"
+        out.write(f"  {_dot_quote(node)} [label={_dot_quote(label)}];\n")
+    for u, v, attr in graph.edges(data=True):
+        out.write(f"  {_dot_quote(u)} -> {_dot_quote(v)} [label={_dot_quote(attr.get('relationship', ''))}];\n")
+    out.write("}\n")
+
+
+def visualize_graph(graph: nx.DiGraph, out: Optional[str] = None) -> None:
     """
     Visualizes a NetworkX graph with labels and relationships.
+
+    With ``out``, the graph is written to that path as GraphViz DOT (see
+    write_graph_dot) instead of being laid out and shown with matplotlib.
+
+    The spring layout is seeded with VISUALIZE_LAYOUT_SEED. From 500 nodes on,
+    networkx computes it with its vectorized scipy energy method (scipy must be
+    installed); for graphs much larger than that, render the DOT output with
+    GraphViz's ``sfdp`` instead. Graphs with more than VISUALIZE_DETAIL_MAX_EDGES
+    edges are drawn without arrow heads and edge labels.
     """
-    pos = nx.spring_layout(graph)
+    if out is not None:
+        with open(out, "w", encoding="utf-8") as f:
+            write_graph_dot(graph, f)
+        return
+
+    import matplotlib.pyplot as plt  # heavy; only needed when actually plotting
+
+    pos = nx.spring_layout(graph, seed=VISUALIZE_LAYOUT_SEED)
     labels = {node: f"{data['data']['node_type']}\n{data['data']['name']}" for node, data in graph.nodes(data=True)}
-    nx.draw(graph, pos, labels=labels, with_labels=True, node_size=2000)
-    edge_labels = {(u, v): d["relationship"] for u, v, d in graph.edges(data=True)}
-    nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels)
+    detailed = graph.number_of_edges() <= VISUALIZE_DETAIL_MAX_EDGES
+    # arrows=False makes networkx draw all edges as a single LineCollection.
+    nx.draw(graph, pos, labels=labels, with_labels=True, node_size=2000, arrows=None if detailed else False)
+    if detailed:
+        edge_labels = {(u, v): d["relationship"] for u, v, d in graph.edges(data=True)}
+        nx.draw_networkx_edge_labels(graph, pos, edge_labels=edge_labels)
     plt.show()
 
 
-def dump_graph_to_neo4j(graph: nx.DiGraph, uri: str, user: str, password: str, *, cleanup: bool = False) -> None:
+def _batches(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yields consecutive slices of at most ``size`` rows."""
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+def _run_write(tx, query: str, **params: Any) -> None:
+    """Transaction function running one write query (see dump_graph_to_neo4j)."""
+    tx.run(query, **params)
+
+
+def dump_graph_to_neo4j(
+    graph: nx.DiGraph, uri: str, user: str, password: str, *, cleanup: bool = False, database: str = "neo4j"
+) -> None:
     """
     Dumps a NetworkX graph to a Neo4j database.
+
+    Nodes are grouped by label and edges by relationship type, then written with one
+    UNWIND query per batch of NEO4J_BATCH_SIZE rows instead of one query per item.
+    All nodes also carry the NEO4J_NODE_LABEL label, whose id index makes the node
+    MERGE and the edge endpoint lookups index seeks rather than scans over every node.
+    Nodes and edges are merged, so dumping the same graph twice does not duplicate it.
+
+    All queries go through one session on ``database``; each batch is its own managed
+    write transaction (``execute_write``), which the driver retries on transient errors.
     """
+    nodes_by_label: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for node_id, attr in graph.nodes(data=True):
+        data = attr.get("data", {})
+        if not data:
+            continue
+        metadata = data.get("metadata", {})
+        label = data.get("node_type", "Unknown").capitalize()
+        nodes_by_label[label].append(
+            {
+                "id": data.get("id"),
+                "name": data.get("name"),
+                "node_type": data.get("node_type"),
+                "source_file": metadata.get("source_file"),
+                "docstring": metadata.get("docstring"),
+                "line_start": metadata.get("line_start"),
+                "line_end": metadata.get("line_end"),
+                "type_hint": metadata.get("type_hint"),
+            }
+        )
+
+    edges_by_rel: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for u, v, edge_attr in graph.edges(data=True):
+        rel = edge_attr.get("relationship")
+        if rel:
+            edges_by_rel[rel].append({"source_id": u, "target_id": v})
+
+    from neo4j import GraphDatabase
+
     driver = GraphDatabase.driver(uri, auth=(user, password))
-    with driver.session() as session:
+    with driver.session(database=database) as session:
         if cleanup:
-            session.run("MATCH (n) DETACH DELETE n")
-        for node_id, attr in graph.nodes(data=True):
-            data = attr.get("data", {})
-            if not data:
-                continue
-            label = data.get("node_type", "Unknown").capitalize()
-            session.run(
-                f"""
-                CREATE (n:{label} {{
-                    id: $id, name: $name, node_type: $node_type,
-                    source_file: $source_file, docstring: $docstring,
-                    line_start: $line_start, line_end: $line_end,
-                    type_hint: $type_hint
-                }})
-                """,
-                **{
-                    "id": data.get("id"),
-                    "name": data.get("name"),
-                    "node_type": data.get("node_type"),
-                    "source_file": data.get("metadata", {}).get("source_file"),
-                    "docstring": data.get("metadata", {}).get("docstring"),
-                    "line_start": data.get("metadata", {}).get("line_start"),
-                    "line_end": data.get("metadata", {}).get("line_end"),
-                    "type_hint": data.get("metadata", {}).get("type_hint"),
-                },
-            )
-        for u, v, edge_attr in graph.edges(data=True):
-            rel = edge_attr.get("relationship")
-            if rel:
-                # It's good to restrict the allowed relationship types if possible.
-                session.run(
-                    """
-                    MATCH (a {id: $source_id}), (b {id: $target_id})
-                    CREATE (a)-[r:%s]->(b)
-                    """
-                    % rel.upper(),
-                    source_id=u,
-                    target_id=v,
+            session.execute_write(_run_write, "MATCH (n) DETACH DELETE n")
+        session.run(_CREATE_ID_INDEX_QUERY)
+        for label, rows in nodes_by_label.items():
+            query = f"UNWIND $rows AS row MERGE (n:{NEO4J_NODE_LABEL} {{id: row.id}}) SET n:{label}, n += row"
+            for batch in _batches(rows, NEO4J_BATCH_SIZE):
+                session.execute_write(_run_write, query, rows=batch)
+        for rel, rows in edges_by_rel.items():
+            query = _CREATE_EDGE_QUERIES.get(rel)
+            if query is None:
+                logger.warning(
+                    "[dump_graph_to_neo4j] Skipping %d edge(s) with unknown relationship type '%s'.", len(rows), rel
                 )
+                continue
+            for batch in _batches(rows, NEO4J_BATCH_SIZE):
+                session.execute_write(_run_write, query, rows=batch)
     driver.close()
 
 
@@ -84,12 +194,7 @@ def build_from_code(source_file: str, code: str, project_root: str = "") -> Code
     """
     Parses the provided code using CodeVisitor and builds a CodeGraph.
     """
-    tree = ast.parse(code)
-    visitor = CodeVisitor(source_file=source_file, code=code, project_root=project_root)
-    visitor.visit(tree)
-    cg = CodeGraph()
-    cg.build_from_nodes(visitor.get_graph_nodes())
-    return cg
+    return CodeGraph().build_from_code(source_file=source_file, code=code, project_root=project_root)
 
 
 def read_python_file(filepath: Path) -> Optional[str]:
@@ -102,28 +207,145 @@ def read_python_file(filepath: Path) -> Optional[str]:
 
 
 def merge_graphs(master: CodeGraph, module_graph: CodeGraph) -> None:
-    """Merges a module-level CodeGraph into a master project-wide CodeGraph."""
+    """
+    Merges a module-level CodeGraph into a master project-wide CodeGraph.
+
+    The module's node and adjacency dicts are read directly into a NodeBatch, so the
+    merge goes through the same bulk insertion path as parsed files.
+    """
     module_nx_graph = module_graph.get_networkx_graph()
-    for node_id, attr in module_nx_graph.nodes(data=True):
-        node_data = attr.get("data", attr)
-        master.graph.add_node(node_id, data=node_data)
-    for u, v, edge_attr in module_nx_graph.edges(data=True):
-        master.graph.add_edge(u, v, relationship=edge_attr.get("relationship", ""))
+    node_attrs = module_nx_graph.nodes.items()
+    master.build_from_batch(NodeBatch(
+        ids=[node_id for node_id, _ in node_attrs],
+        node_data=[attr.get("data", attr) for _, attr in node_attrs],
+        edges=[
+            (u, v, edge_attr.get("relationship", ""))
+            for u, neighbours in module_nx_graph.adj.items()
+            for v, edge_attr in neighbours.items()
+        ],
+    ))
+
+
+def _parse_project_file(filepath: str, project_root: str) -> Optional[NodeBatch]:
+    """
+    Reads and visits a single project file, returning its graph nodes as a NodeBatch.
+    Runs inside a worker process of build_project_graph, so it must stay picklable;
+    the batch pickles as plain lists and dicts rather than Pydantic models.
+
+    The source is handed to ast.parse as raw bytes, which skips building a decoded
+    str copy and honours PEP 263 encoding declarations. Files of at least
+    MMAP_MIN_SIZE bytes are memory-mapped rather than read.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap also refuses empty files (e.g. bare __init__.py).
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size >= MMAP_MIN_SIZE else None
+            with mapped if mapped is not None else nullcontext(f.read()) as source:
+                tree = ast.parse(source)
+                visitor = CodeVisitor(source_file=filepath, code=source, project_root=project_root, tree=tree)
+                visitor.visit(tree)
+                return visitor.get_graph_batch()
+    except IOError as e:
+        logger.error(f"[_parse_project_file] Skipping {filepath}: {e}")
+        return None
+    except SyntaxError as e:
+        # Undecodable source surfaces from the parser as a "(unicode error)" SyntaxError.
+        if not str(e.msg).startswith("(unicode error)"):
+            raise
+        logger.error(f"[_parse_project_file] Skipping {filepath}: {e}")
+        return None
 
 
-def build_project_graph(project_path: str) -> CodeGraph:
+def _iter_python_files(root: str) -> Iterator[str]:
+    """
+    Yields the paths of all ``.py`` files below root, in the same order as
+    ``Path(root).rglob("*.py")``: a directory's files first, then its subdirectories
+    depth-first, without following directory symlinks. Uses the cached entry types
+    from os.scandir instead of building a Path per entry.
+
+    ``__pycache__`` and hidden directories (``.git``, ``.venv``, ``.tox``, ...) are
+    not descended into; they hold no project sources, only bytecode, VCS data or
+    installed third-party packages.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIPPED_DIR_NAMES and not entry.name.startswith("."):
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        yield entry.path
+        except PermissionError:
+            continue
+        stack.extend(reversed(subdirs))
+
+
+def _file_size(filepath: str) -> int:
+    """Returns a file's size in bytes, or 0 if it cannot be stat'ed."""
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+def build_project_graph(project_path: str, max_workers: Optional[int] = None, use_cache: bool = False) -> CodeGraph:
     """
     Builds a CodeGraph for an entire project directory by parsing all Python files.
+
+    Files are parsed and visited in a process pool (``max_workers`` defaults to the
+    CPU count), largest first so that no worker is left with a big file at the end;
+    the resulting nodes are merged into the master graph in file order. Fewer than
+    PARALLEL_MIN_FILES files are parsed in-process. With
+    ``use_cache``, files whose mtime and size, or content hash, match a ParseCache
+    entry are not parsed again.
     """
     master = CodeGraph()
     root = Path(project_path)
-    print(f"[build_project_graph] Root directory: {root}")
-    for filepath in root.rglob("*.py"):
-        print(f"[build_project_graph] Processing {filepath}")
-        code = read_python_file(filepath)
-        if code is None:
-            continue
-        module_graph = build_from_code(str(filepath), code, project_root=str(root))
-        merge_graphs(master, module_graph)
+    logger.info("[build_project_graph] Root directory: %s", root)
+    filepaths = list(_iter_python_files(str(root)))
+    cache = ParseCache(str(root)) if use_cache else None
+    try:
+        ready: Dict[str, Optional[NodeBatch]] = cache.load(filepaths) if cache is not None else {}
+        to_parse = sorted((fp for fp in filepaths if fp not in ready), key=_file_size, reverse=True)
+        workers = max_workers or os.cpu_count() or 1
+        # Hand out several chunks per worker so uneven file sizes still balance out.
+        chunksize = max(1, len(to_parse) // (4 * workers))
+        next_index = 0
+
+        def build_ready() -> None:
+            # Results arrive in size order; add them in file order as soon as the next
+            # file in line is available.
+            nonlocal next_index
+            while next_index < len(filepaths) and filepaths[next_index] in ready:
+                filepath = filepaths[next_index]
+                logger.debug("[build_project_graph] Processing %s", filepath)
+                batch = ready.pop(filepath)
+                if batch is not None:
+                    master.build_from_batch(batch)
+                next_index += 1
+
+        build_ready()
+        # Below PARALLEL_MIN_FILES (or with a single worker) pool startup costs more than it saves.
+        parallel = workers > 1 and len(to_parse) >= PARALLEL_MIN_FILES
+        executor = ProcessPoolExecutor(max_workers=workers) if parallel else None
+        with executor if executor is not None else nullcontext():
+            if executor is not None:
+                results = executor.map(_parse_project_file, to_parse, repeat(str(root)), chunksize=chunksize)
+            else:
+                results = map(_parse_project_file, to_parse, repeat(str(root)))
+            for filepath, batch in zip(to_parse, results):
+                if cache is not None:
+                    cache.store(filepath, batch)
+                ready[filepath] = batch
+                build_ready()
+    finally:
+        # Also on failure, so the entries stored so far are committed and the database closed.
+        if cache is not None:
+            cache.close()
     master.merge_nodes_by_reference()
     return master
@@ -24,7 +24,7 @@ def extract_code_components(source_file: str, code: str, project_root: str) -> L
         return []
 
     # Initialize the CodeVisitor to extract components with enriched metadata.
-    visitor = CodeVisitor(source_file=source_file, code=code, project_root=project_root)
+    visitor = CodeVisitor(source_file=source_file, code=code, project_root=project_root, tree=tree)
     visitor.visit(tree)
     return visitor.get_graph_nodes()
 
@@ -5,6 +5,7 @@ models.py
 This module defines the Pydantic models used for code component indexing.
 It includes custom validation for MongoDB ObjectIds as well as the following models:
   - ObjectIdPydanticAnnotation: A custom annotation for validating and serializing MongoDB ObjectIds.
+  - Float32VectorPydanticAnnotation: A custom annotation storing embedding vectors as float32 arrays.
   - BaseResponseModel: Base model with CRUD operations for MongoDB.
   - FunctionDocumentModel: Represents a function or method document with associated metadata.
   - ClassDocumentModel: Represents a class document with associated metadata.
@@ -13,9 +14,14 @@ It includes custom validation for MongoDB ObjectIds as well as the following mod
 
 from __future__ import annotations
 
+import sys
+from array import array
 from datetime import datetime
+from itertools import islice
 from typing import List, Optional, Any, Annotated, Self
+
 from bson import ObjectId
+from bson.binary import Binary, BinaryVectorDtype, VECTOR_SUBTYPE
 from pymongo.collection import Collection
 from pydantic import BaseModel, Field
 from pydantic.json_schema import JsonSchemaValue
@@ -49,6 +55,100 @@ class ObjectIdPydanticAnnotation:
         return handler(core_schema.str_schema())
 
 
+# Documents sent per insert_many call by BaseResponseModel.save_all.
+SAVE_ALL_BATCH_SIZE = 5000
+
+# BSON vector header: dtype byte followed by the (always zero for float32) padding byte.
+_FLOAT32_VECTOR_HEADER = BinaryVectorDtype.FLOAT32.value + b"\x00"
+_INT8_VECTOR_HEADER = BinaryVectorDtype.INT8.value + b"\x00"
+
+# Scale between unit-range float components and int8 quantized components.
+INT8_SCALE = 127.0
+
+
+# BSON vectors are little-endian; array("f") uses the machine's byte order.
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+def _float32_array(vector: Any) -> array:
+    """Returns a vector (list, array or numpy array) as a one-dimensional float32 array."""
+    if isinstance(vector, array) and vector.typecode == "f":
+        return vector
+    try:
+        return array("f", vector)
+    except TypeError:
+        raise ValueError("Embedding vector must be a one-dimensional sequence of numbers") from None
+
+
+def _le_bytes(values: array) -> bytes:
+    """Returns an array's items as little-endian bytes."""
+    if _SWAP_BYTES:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def to_float32_binary(vector: Any) -> Binary:
+    """Encodes a vector (list or array) as a BSON float32 vector (Binary subtype 9)."""
+    return Binary(_FLOAT32_VECTOR_HEADER + _le_bytes(_float32_array(vector)), VECTOR_SUBTYPE)
+
+
+def to_int8_binary(vector: Any) -> Binary:
+    """
+    Scalar-quantizes a vector with components in [-1, 1] (e.g. a normalized embedding)
+    and encodes it as a BSON int8 vector.
+    """
+    # Scaled through a float32 array so rounding sees the same float32 products as before.
+    scaled = array("f", (x * INT8_SCALE for x in _float32_array(vector)))
+    quantized = array("b", (max(-128, min(127, round(x))) for x in scaled))
+    return Binary(_INT8_VECTOR_HEADER + quantized.tobytes(), VECTOR_SUBTYPE)
+
+
+class Float32VectorPydanticAnnotation:
+    """
+    Keeps embedding vectors as contiguous float32 arrays (``array("f")``) instead of
+    lists of Python floats. Serializes to a BSON float32 vector (Binary subtype 9) for MongoDB
+    and to a plain list of floats in JSON mode.
+    """
+
+    @classmethod
+    def validate_vector(cls, v: Any) -> array:
+        if isinstance(v, Binary) and v.subtype == VECTOR_SUBTYPE:
+            raw = bytes(v)
+            if raw[:1] == BinaryVectorDtype.FLOAT32.value:
+                vector = array("f", raw[2:])
+                if _SWAP_BYTES:
+                    vector.byteswap()
+                return vector
+            if raw[:1] == BinaryVectorDtype.INT8.value:
+                return array("f", (x / INT8_SCALE for x in array("b", raw[2:])))
+            raise ValueError("Embedding vector must be a float32 or int8 BSON vector")
+        return _float32_array(v)
+
+    @classmethod
+    def serialize_vector(cls, v: array, info) -> Any:
+        if info.mode_is_json():
+            return v.tolist()
+        return to_float32_binary(v)
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source_type, _handler
+    ) -> core_schema.CoreSchema:
+        assert source_type is array
+        return core_schema.no_info_plain_validator_function(
+            cls.validate_vector,
+            serialization=core_schema.plain_serializer_function_ser_schema(cls.serialize_vector, info_arg=True),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, _core_schema, handler) -> JsonSchemaValue:
+        return handler(core_schema.list_schema(core_schema.float_schema()))
+
+
+Float32Vector = Annotated[array, Float32VectorPydanticAnnotation]
+
+
 class BaseResponseModel(BaseModel):
     """Base model providing MongoDB CRUD operations for code components."""
     __doc_name__: str = ""  # Expected format: "<database>.<collection>"
@@ -91,16 +191,25 @@ class BaseResponseModel(BaseModel):
 
     def save(self, conn) -> Self:
         col = self.collection(conn)
-        res = col.insert_one(self.model_dump())
-        if res.inserted_id:
-            self._id = res.inserted_id
+        res = col.insert_one(self.model_dump(by_alias=True))
+        if res.inserted_id and res.inserted_id != self.id:
+            self.id = res.inserted_id
         return self
 
     @classmethod
     def save_all(cls, conn, items: list[Self]) -> List[ObjectId]:
+        """
+        Inserts items in unordered batches of SAVE_ALL_BATCH_SIZE, so only one batch of
+        dumped documents is held at a time and a failing document does not stop the rest
+        of its batch.
+        """
         col = cls.collection(conn)
-        res = col.insert_many([item.model_dump() for item in items])
-        return res.inserted_ids
+        inserted_ids = []
+        dumps = (item.model_dump(by_alias=True) for item in items)
+        while batch := list(islice(dumps, SAVE_ALL_BATCH_SIZE)):
+            res = col.insert_many(batch, ordered=False)
+            inserted_ids.extend(res.inserted_ids)
+        return inserted_ids
 
     @classmethod
     def delete(cls, conn, query: dict) -> None:
@@ -139,7 +248,7 @@ class FunctionDocumentModel(BaseResponseModel):
         signature (str): Function signature.
         type (str): Type of function, e.g., "function", "async_function", or "method".
         decorators (List[str]): List of decorators applied to the function.
-        embedding_vector (List[float]): Embedding vector for semantic search.
+        embedding_vector (Float32Vector): Embedding vector for semantic search, stored as float32.
         docstring (str): Documentation string.
         model (str): Model identifier for the embedding.
         created_at (datetime): Timestamp when document was created.
@@ -151,7 +260,7 @@ class FunctionDocumentModel(BaseResponseModel):
     signature: str
     type: str  # "function", "async_function", or "method"
     decorators: List[str]
-    embedding_vector: List[float]
+    embedding_vector: Float32Vector
     docstring: str
     model: str
     created_at: datetime
@@ -168,7 +277,7 @@ class ClassDocumentModel(BaseResponseModel):
         signature (str): Class signature.
         type (str): Document type; should be "class".
         decorators (List[str]): List of decorators applied to the class.
-        embedding_vector (List[float]): Embedding vector for semantic search.
+        embedding_vector (Float32Vector): Embedding vector for semantic search, stored as float32.
         member_variables (List[str]): List of member variables.
         function_ids (List[ObjectId]): List of function ObjectIds belonging to the class.
         docstring (str): Documentation string.
@@ -181,7 +290,7 @@ class ClassDocumentModel(BaseResponseModel):
     signature: str
     type: str  # should be "class"
     decorators: List[str]
-    embedding_vector: List[float]
+    embedding_vector: Float32Vector
     member_variables: List[str]
     function_ids: List[ObjectId] = []
     docstring: str
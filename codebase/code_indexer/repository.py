@@ -8,14 +8,199 @@ operations for embedding documents representing code components.
 """
 
 
+import importlib.util
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Union
-from pymongo import MongoClient, ASCENDING, UpdateOne
+from typing import Dict, Iterator, List, Literal, Optional, Sequence, Set, Tuple, Union
+from pymongo import MongoClient, ASCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.collection import Collection
 from pymongo.database import Database
+from pymongo.errors import OperationFailure
+from pymongo.operations import SearchIndexModel
+from pymongo.results import BulkWriteResult
+from pymongo.write_concern import WriteConcern
 from bson import ObjectId
+from bson.binary import Binary
+from pydantic import TypeAdapter
 
-from codebase.code_indexer.models import ClassDocumentModel, FunctionDocumentModel
+from codebase.code_indexer.models import (
+    ClassDocumentModel,
+    FunctionDocumentModel,
+    to_float32_binary,
+    to_int8_binary,
+)
+
+
+# Operations per bulk_write call, and how many of those calls may run at once.
+BULK_WRITE_CHUNK_SIZE = 10_000
+BULK_WRITE_WORKERS = 8
+
+
+def _chunked(seq: Sequence, n: int = BULK_WRITE_CHUNK_SIZE) -> Iterator[Sequence]:
+    """Yields consecutive slices of at most n items."""
+    for i in range(0, len(seq), n):
+        yield seq[i : i + n]
+
+
+# Process-wide MongoClients by URI; each client owns a connection pool and monitor
+# threads, so repositories for different projects share them.
+_clients: Dict[str, MongoClient] = {}
+
+# (mongo_uri, db_name, project_name) of the collections whose indexes this process
+# has already created, so further repositories for the same project skip the DDL.
+_indexed_projects: Set[Tuple[str, str, str]] = set()
+
+
+def _wire_compressors() -> str:
+    """Lists the wire compressors usable here, best first; zlib needs no extra package."""
+    compressors = []
+    for name, module in (("zstd", "zstandard"), ("snappy", "snappy")):
+        if importlib.util.find_spec(module) is not None:
+            compressors.append(name)
+    compressors.append("zlib")
+    return ",".join(compressors)
+
+
+def _get_client(mongo_uri: str) -> MongoClient:
+    """Returns the shared MongoClient for a URI, creating it on first use.
+
+    Embedding and docstring payloads are compressed on the wire with the best
+    compressor both sides support (servers before 4.2 simply negotiate none).
+    """
+    client = _clients.get(mongo_uri)
+    if client is None:
+        client = _clients[mongo_uri] = MongoClient(
+            mongo_uri,
+            maxPoolSize=200,
+            minPoolSize=16,
+            maxIdleTimeMS=60_000,
+            compressors=_wire_compressors(),
+            zlibCompressionLevel=3,
+            appname="code-indexer",
+            retryWrites=True,
+        )
+    return client
+
+
+def shutdown() -> None:
+    """Closes every shared MongoClient; call once when the process is done with MongoDB."""
+    for client in _clients.values():
+        client.close()
+    _clients.clear()
+    _indexed_projects.clear()
+
+
+def _num_candidates(limit: int) -> int:
+    """ANN candidates for a vector search: ~10x the limit, at least 150, at most 2000."""
+    return max(limit, min(max(limit * 10, 150), 2000))
+
+
+# Above this many dimensions int8 quantization loses too much recall to be worth it.
+INT8_MAX_DIMS = 2048
+
+
+# Server error code for an index that already exists (IndexAlreadyExists).
+_INDEX_ALREADY_EXISTS = 68
+
+# Server-side time limit for a single vector search aggregation.
+SEARCH_MAX_TIME_MS = 5000
+
+
+def _search_cursor_options(limit: int) -> dict:
+    """Aggregate options for a vector search returning at most ``limit`` documents:
+    fetch them in a single batch, never spill to disk, and bound the run time."""
+    return {"batchSize": limit, "allowDiskUse": False, "maxTimeMS": SEARCH_MAX_TIME_MS}
+
+
+# Serialize a whole list of documents in one call instead of one model_dump per item.
+_CLASS_DOCS = TypeAdapter(List[ClassDocumentModel])
+_FUNCTION_DOCS = TypeAdapter(List[FunctionDocumentModel])
+
+
+def _upsert_op(filter_criteria: dict, dumped: dict, now: datetime) -> UpdateOne:
+    """Builds an upsert that keeps the stored _id and created_at of existing documents."""
+    on_insert = {"_id": dumped.pop("_id"), "created_at": now}
+    dumped.pop("created_at", None)
+    dumped["updated_at"] = now
+    return UpdateOne(filter_criteria, {"$set": dumped, "$setOnInsert": on_insert}, upsert=True)
+
+
+def _bulk_write_chunked(collection: Collection, ops: List[UpdateOne]) -> List[BulkWriteResult]:
+    """Submits ops as concurrent unordered bulk writes of BULK_WRITE_CHUNK_SIZE operations.
+
+    Args:
+        collection (Collection): Target collection.
+        ops (List[UpdateOne]): Write operations; their relative order is not preserved.
+
+    Returns:
+        List[BulkWriteResult]: One result per chunk, in chunk order.
+
+    Raises:
+        BulkWriteError: Re-raised from the first chunk that failed, after all chunks finish.
+    """
+    chunks = list(_chunked(ops))
+    if len(chunks) == 1:
+        return [collection.bulk_write(chunks[0], ordered=False)]
+    with ThreadPoolExecutor(max_workers=min(BULK_WRITE_WORKERS, len(chunks))) as executor:
+        futures = [executor.submit(collection.bulk_write, chunk, ordered=False) for chunk in chunks]
+    return [future.result() for future in futures]
+
+
+def _row_key(filter_criteria: dict) -> tuple:
+    """Unique key of a stored document: the values of its filter, in filter order."""
+    return tuple(filter_criteria.values())
+
+
+def _find_ids(collection: Collection, filters: List[dict]) -> Dict[tuple, ObjectId]:
+    """Looks up the _ids of existing documents, one $or query per chunk of filters."""
+    ids = {}
+    for chunk in _chunked(filters):
+        keys = list(chunk[0])
+        projection = {"_id": 1, **{key: 1 for key in keys}}
+        for doc in collection.find({"$or": list(chunk)}, projection):
+            ids[tuple(doc.get(key) for key in keys)] = doc["_id"]
+    return ids
+
+
+def _upsert_chunked(collection: Collection, rows: List[Tuple[dict, dict]], now: datetime) -> Dict[tuple, ObjectId]:
+    """Upserts (filter, document) rows through _bulk_write_chunked.
+
+    Returns the stored _id of each row by _row_key. Inserted ids come from the bulk
+    write results; rows that matched an existing document keep its _id, which is read
+    back afterwards.
+    """
+    ops = [_upsert_op(filter_criteria, dumped, now) for filter_criteria, dumped in rows]
+    results = _bulk_write_chunked(collection, ops)
+    ids = {}
+    for start, result in zip(range(0, len(rows), BULK_WRITE_CHUNK_SIZE), results):
+        if result.acknowledged:
+            for index, _id in result.upserted_ids.items():
+                ids[_row_key(rows[start + index][0])] = _id
+    matched = [filter_criteria for filter_criteria, _ in rows if _row_key(filter_criteria) not in ids]
+    if matched:
+        ids.update(_find_ids(collection, matched))
+    return ids
+
+
+def _replace_chunked(collection: Collection, rows: List[Tuple[dict, dict]], now: datetime) -> Dict[tuple, ObjectId]:
+    """Deletes the documents matching each chunk's filters, then bulk inserts the chunk.
+
+    Only the last row per _row_key is written: a duplicate key would make insert_many
+    fail after the old documents were already deleted. Returns the _id of each inserted
+    row by _row_key.
+    """
+    rows = list({_row_key(filter_criteria): (filter_criteria, dumped) for filter_criteria, dumped in rows}.values())
+    ids = {}
+    for chunk in _chunked(rows):
+        collection.delete_many({"$or": [filter_criteria for filter_criteria, _ in chunk]})
+        documents = []
+        for filter_criteria, dumped in chunk:
+            dumped["created_at"] = dumped["updated_at"] = now
+            documents.append(dumped)
+            ids[_row_key(filter_criteria)] = dumped["_id"]
+        collection.insert_many(documents, ordered=False)
+    return ids
 
 
 class EmbeddingRepository:
@@ -26,14 +211,17 @@ class EmbeddingRepository:
     methods to update and delete documents, allowing the repository to reflect changes
     from the codebase.
 
-    New collections are created dynamically based on the project name.
+    New collections are created dynamically based on the project name. Repositories
+    share one MongoClient per URI, and indexes are created once per project and process.
     """
     def __init__(
         self,
         mongo_uri: str,
         project_name: str,
         db_name: str = "code_embeddings",
-        vector_dims: int = 384
+        vector_dims: int = 384,
+        write_concern: Optional[WriteConcern] = WriteConcern(w=1, j=False),
+        quantize_int8: bool = False,
     ):
         """
         Initializes the repository with collections based on the project name.
@@ -44,57 +232,103 @@ class EmbeddingRepository:
                 "<project_name>_classes" and "<project_name>_functions".
             db_name (str, optional): Database name. Defaults to "code_embeddings".
             vector_dims (int, optional): Dimensions of the embedding vectors. Defaults to 384.
+            write_concern (Optional[WriteConcern], optional): Write concern for the collections.
+                Defaults to acknowledged writes without waiting for the journal; pass None to
+                inherit the client's write concern.
+            quantize_int8 (bool, optional): Store embeddings (and send queries) as int8 BSON
+                vectors, for normalized embeddings only. Ignored above INT8_MAX_DIMS dimensions.
+                Defaults to False.
         """
-        self.client = MongoClient(mongo_uri)
+        self.client = _get_client(mongo_uri)
         self.db: Database = self.client[db_name]
         # Create dynamic collection names based on project name.
-        self.classes = self.db[f"{project_name}_classes"]
-        self.functions = self.db[f"{project_name}_functions"]
+        self.classes = self.db.get_collection(f"{project_name}_classes", write_concern=write_concern)
+        self.functions = self.db.get_collection(f"{project_name}_functions", write_concern=write_concern)
         self.vector_dims = vector_dims
-        self._ensure_indexes()
-        self._create_vector_search_indexes()
+        self.quantize_int8 = quantize_int8 and vector_dims <= INT8_MAX_DIMS
+        if quantize_int8 and not self.quantize_int8:
+            logging.warning(f"int8 quantization disabled for {vector_dims}-dimensional embeddings")
+        index_key = (mongo_uri, db_name, project_name)
+        if index_key not in _indexed_projects:
+            self._ensure_indexes()
+            self._create_vector_search_indexes()
+            _indexed_projects.add(index_key)
 
     def _ensure_indexes(self):
-        """Create standard indexes for the dynamic classes and functions collections."""
-        self.classes.create_index([("package", ASCENDING), ("name", ASCENDING)], unique=True)
-        self.classes.create_index("model")
-        self.functions.create_index(
-            [("package", ASCENDING), ("name", ASCENDING), ("parent_class_id", ASCENDING)],
-            unique=True,
-        )
-        self.functions.create_index("parent_class_id")
-        self.functions.create_index("type")
-        self.functions.create_index("model")
+        """Create standard indexes for the dynamic classes and functions collections.
+
+        Each collection gets a single createIndexes command. Index names are left to
+        the server defaults so existing indexes are recognized rather than conflicting.
+        """
+        self.classes.create_indexes([
+            IndexModel([("package", ASCENDING), ("name", ASCENDING)], unique=True),
+            IndexModel("model"),
+        ])
+        self.functions.create_indexes([
+            IndexModel(
+                [("package", ASCENDING), ("name", ASCENDING), ("parent_class_id", ASCENDING)],
+                unique=True,
+            ),
+            IndexModel("parent_class_id"),
+            IndexModel("type"),
+            IndexModel("model"),
+        ])
+
+    def _vector_field(self) -> dict:
+        """Vector field definition shared by both vector search indexes."""
+        return {
+            "type": "vector",
+            "path": "embedding_vector",
+            "numDimensions": self.vector_dims,
+            "similarity": "cosine",
+        }
 
     def _create_vector_search_indexes(self):
         """Create vector search indexes for the dynamic collections.
 
-        Attempts to create indexes for vector search. If indexes already exist,
-        a warning is logged.
+        The function index also declares parent_class_id and type as filter fields,
+        so find_similar_functions can pre-filter inside $vectorSearch. Indexes that
+        already exist are skipped; servers without vector search support log a warning
+        instead of failing repository construction.
+        """
+        self._create_vector_search_index(
+            self.classes, "vector_search_class", [self._vector_field()]
+        )
+        self._create_vector_search_index(
+            self.functions,
+            "vector_search_function",
+            [
+                self._vector_field(),
+                {"type": "filter", "path": "parent_class_id"},
+                {"type": "filter", "path": "type"},
+            ],
+        )
+
+    @staticmethod
+    def _create_vector_search_index(collection: Collection, name: str, fields: List[dict]) -> None:
+        """Creates one vectorSearch index on a collection unless it already exists.
+
+        Args:
+            collection (Collection): Collection to index.
+            name (str): Index name.
+            fields (List[dict]): Vector and filter field definitions.
         """
         try:
-            self.db.command({
-                "createIndexes": self.classes.name,
-                "indexes": [
-                    {
-                        "name": "vector_search_class",
-                        "key": {"embedding_vector": "vectorSearch"},
-                        "vectorSearchOptions": {"dimension": self.vector_dims, "similarity": "cosine"},
-                    }
-                ],
-            })
-            self.db.command({
-                "createIndexes": self.functions.name,
-                "indexes": [
-                    {
-                        "name": "vector_search_function",
-                        "key": {"embedding_vector": "vectorSearch"},
-                        "vectorSearchOptions": {"dimension": self.vector_dims, "similarity": "cosine"},
-                    }
-                ],
-            })
-        except Exception as e:
-            logging.warning(f"Vector search indexes might already exist: {e}")
+            if any(index["name"] == name for index in collection.list_search_indexes(name)):
+                return
+            collection.create_search_index(
+                SearchIndexModel(definition={"fields": fields}, name=name, type="vectorSearch")
+            )
+        except OperationFailure as e:
+            if e.code == _INDEX_ALREADY_EXISTS:
+                return
+            logging.warning(f"Could not create vector search index '{name}' on {collection.name}: {e}")
+
+    def _query_vector(self, embedding_vector: List[float]) -> Binary:
+        """Encodes a query vector in the same BSON vector type as the stored embeddings."""
+        if self.quantize_int8:
+            return to_int8_binary(embedding_vector)
+        return to_float32_binary(embedding_vector)
 
     def upsert_document(self, filter_criteria: dict, document: dict) -> ObjectId:
         """
@@ -124,74 +358,90 @@ class EmbeddingRepository:
 
         now = datetime.now()
         document["updated_at"] = now
-        # Preserve created_at if the document already exists.
-        existing_doc = collection.find_one(filter_criteria)
-        if existing_doc:
-            document["created_at"] = existing_doc.get("created_at", now)
-        else:
-            document["created_at"] = now
-
-        result = collection.update_one(filter_criteria, {"$set": document}, upsert=True)
-        if result.upserted_id is not None:
-            return result.upserted_id
-        else:
-            updated_doc = collection.find_one(filter_criteria)
-            return updated_doc["_id"]
+        # created_at is only written on insert, so an existing value is preserved
+        # without reading the document first.
+        set_fields = {key: value for key, value in document.items() if key != "created_at"}
+        result = collection.find_one_and_update(
+            filter_criteria,
+            {"$set": set_fields, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            projection={"_id": 1},
+        )
+        return result["_id"]
 
     def store_embeddings(
         self,
         embeddings: Dict[str, List[Union[ClassDocumentModel, FunctionDocumentModel]]],
-        model: str
+        model: str,
+        mode: Literal["upsert", "replace"] = "upsert",
     ) -> Dict[str, ObjectId]:
-        """Stores embedding documents in MongoDB using bulk upsert operations.
+        """Stores embedding documents in MongoDB using unordered bulk operations.
+
+        In "upsert" mode (the default, for incremental indexing) every document is upserted
+        by its unique key, keeping the _id and created_at of existing documents. In
+        "replace" mode, meant for full re-indexing, documents with the same keys are
+        deleted and the new documents are bulk inserted, which avoids the per-operation
+        upsert lookups; existing _ids and created_at values are not preserved.
 
         Args:
             embeddings (Dict[str, List[Union[ClassDocumentModel, FunctionDocumentModel]]]):
                 Dictionary containing lists of class and function documents.
             model (str): Identifier for the embedding model.
+            mode (Literal["upsert", "replace"], optional): Write strategy. Defaults to "upsert".
 
         Returns:
-            Dict[str, ObjectId]: Mapping from entity names to their stored ObjectIds.
+            Dict[str, ObjectId]: Mapping from entity names to their stored ObjectIds. In
+                "upsert" mode the ids of documents that already existed are read back after
+                the write, since their stored _id is kept.
+
+        Raises:
+            ValueError: If an unsupported mode is provided.
         """
         stored_ids = {}
         current_time = datetime.now()
-
-        # Bulk upsert for class documents.
-        class_ops = []
-        for class_doc in embeddings.get("classes", []):
-            class_doc.created_at = current_time
-            class_doc.updated_at = current_time
-            filter_criteria = {"package": class_doc.package, "name": class_doc.name}
-            class_ops.append(
-                UpdateOne(filter_criteria, {"$set": class_doc.model_dump(by_alias=True)}, upsert=True)
-            )
-            stored_ids[class_doc.name] = class_doc._id
-        if class_ops:
-            self.classes.bulk_write(class_ops)
-
-        # Bulk upsert for function documents.
-        function_ops = []
-        for function_doc in embeddings.get("functions", []):
-            function_doc.created_at = current_time
-            function_doc.updated_at = current_time
-            if function_doc.type == "method":
-                filter_criteria = {
-                    "package": function_doc.package,
-                    "name": function_doc.name,
-                    "parent_class_id": function_doc.parent_class_id,
-                }
-            else:
-                filter_criteria = {
-                    "package": function_doc.package,
-                    "name": function_doc.name,
-                    "parent_class_id": None,
-                }
-            function_ops.append(
-                UpdateOne(filter_criteria, {"$set": function_doc.model_dump(by_alias=True)}, upsert=True)
-            )
-            stored_ids[function_doc.name] = function_doc._id
-        if function_ops:
-            self.functions.bulk_write(function_ops)
+        if mode == "replace":
+            write = _replace_chunked
+        elif mode == "upsert":
+            write = _upsert_chunked
+        else:
+            raise ValueError("Invalid store mode. Must be 'upsert' or 'replace'.")
+
+        # Bulk write for class documents.
+        class_docs = embeddings.get("classes", [])
+        class_rows = []
+        for class_doc, dumped in zip(class_docs, _CLASS_DOCS.dump_python(class_docs, by_alias=True)):
+            if self.quantize_int8:
+                dumped["embedding_vector"] = to_int8_binary(class_doc.embedding_vector)
+            filter_criteria = {"package": dumped["package"], "name": dumped["name"]}
+            class_rows.append((filter_criteria, dumped))
+        if class_rows:
+            ids = write(self.classes, class_rows, current_time)
+            for filter_criteria, _ in class_rows:
+                key = _row_key(filter_criteria)
+                if key in ids:
+                    stored_ids[filter_criteria["name"]] = ids[key]
+
+        # Bulk write for function documents.
+        function_docs = embeddings.get("functions", [])
+        function_rows = []
+        for function_doc, dumped in zip(function_docs, _FUNCTION_DOCS.dump_python(function_docs, by_alias=True)):
+            if self.quantize_int8:
+                dumped["embedding_vector"] = to_int8_binary(function_doc.embedding_vector)
+            # Same keys, in the same order, as the unique (package, name, parent_class_id)
+            # index for every function type; parent_class_id is None for non-methods.
+            filter_criteria = {
+                "package": dumped["package"],
+                "name": dumped["name"],
+                "parent_class_id": dumped["parent_class_id"],
+            }
+            function_rows.append((filter_criteria, dumped))
+        if function_rows:
+            ids = write(self.functions, function_rows, current_time)
+            for filter_criteria, _ in function_rows:
+                key = _row_key(filter_criteria)
+                if key in ids:
+                    stored_ids[filter_criteria["name"]] = ids[key]
 
         return stored_ids
 
@@ -240,81 +490,83 @@ class EmbeddingRepository:
         parent_class_id: Optional[ObjectId] = None,
         function_type: Optional[str] = None,
         limit: int = 10,
+        project_embedding: bool = False,
     ) -> List[dict]:
         """Finds similar functions using a vector search pipeline.
 
         Args:
-            embedding_vector (List[float]): Query embedding vector.
+            embedding_vector (List[float]): Query embedding vector; sent as a BSON vector.
             parent_class_id (Optional[ObjectId], optional): Filter by parent class. Defaults to None.
             function_type (Optional[str], optional): Filter by function type. Defaults to None.
             limit (int, optional): Number of results to return. Defaults to 10.
+            project_embedding (bool, optional): Include the stored embedding vectors in the
+                results. Defaults to False.
 
         Returns:
             List[dict]: List of function documents with similarity scores.
         """
-        pipeline = [
-            {
-                "$vectorSearch": {
-                    "queryVector": embedding_vector,
-                    "path": "embedding_vector",
-                    "numCandidates": limit * 10,
-                    "limit": limit,
-                    "index": "vector_search_function",
-                }
-            }
-        ]
-        match_conditions = {}
+        # Filters run inside $vectorSearch (fields declared as "filter" in the index),
+        # so they prune candidates before the limit instead of after it.
+        filter_doc = {}
         if parent_class_id:
-            match_conditions["parent_class_id"] = parent_class_id
+            filter_doc["parent_class_id"] = parent_class_id
         if function_type:
-            match_conditions["type"] = function_type
-        if match_conditions:
-            pipeline.append({"$match": match_conditions})
-        pipeline.extend([
-            {
-                "$lookup": {
-                    "from": self.classes.name,
-                    "localField": "parent_class_id",
-                    "foreignField": "_id",
-                    "as": "class",
-                }
-            },
+            filter_doc["type"] = function_type
+        vector_search = {
+            "queryVector": self._query_vector(embedding_vector),
+            "path": "embedding_vector",
+            "numCandidates": _num_candidates(limit),
+            "limit": limit,
+            "index": "vector_search_function",
+        }
+        if filter_doc:
+            vector_search["filter"] = filter_doc
+        pipeline = [
+            {"$vectorSearch": vector_search},
             {
                 "$project": {
                     "_id": 1,
                     "name": 1,
                     "package": 1,
+                    "parent_class_id": 1,
                     "signature": 1,
                     "type": 1,
                     "decorators": 1,
                     "docstring": 1,
-                    "embedding_vector": 1,
+                    **({"embedding_vector": 1} if project_embedding else {}),
                     "model": 1,
                     "created_at": 1,
                     "updated_at": 1,
                     "score": {"$meta": "vectorSearchScore"},
-                    "class": {
-                        "$cond": {
-                            "if": {"$eq": ["$type", "method"]},
-                            "then": {"$arrayElemAt": ["$class", 0]},
-                            "else": None,
-                        }
-                    },
                 }
             },
-        ])
-        return list(self.functions.aggregate(pipeline))
+        ]
+        results = list(self.functions.aggregate(pipeline, **_search_cursor_options(limit)))
+
+        # Attach parent classes with one batched _id lookup instead of a $lookup per hit.
+        parent_ids = list({doc["parent_class_id"] for doc in results if doc.get("type") == "method"})
+        classes = {}
+        if parent_ids:
+            projection = None if project_embedding else {"embedding_vector": 0}
+            classes = {c["_id"]: c for c in self.classes.find({"_id": {"$in": parent_ids}}, projection)}
+        for doc in results:
+            parent_class_id = doc.pop("parent_class_id", None)
+            doc["class"] = classes.get(parent_class_id) if doc.get("type") == "method" else None
+        return results
 
     def find_similar_classes(
         self,
         embedding_vector: List[float],
         limit: int = 10,
+        project_embedding: bool = False,
     ) -> List[dict]:
         """Finds similar classes using a vector search pipeline.
 
         Args:
-            embedding_vector (List[float]): Query embedding vector.
+            embedding_vector (List[float]): Query embedding vector; sent as a BSON vector.
             limit (int, optional): Number of results to return. Defaults to 10.
+            project_embedding (bool, optional): Include the stored embedding vectors in the
+                results. Defaults to False.
 
         Returns:
             List[dict]: List of class documents with similarity scores.
@@ -322,9 +574,9 @@ class EmbeddingRepository:
         pipeline = [
             {
                 "$vectorSearch": {
-                    "queryVector": embedding_vector,
+                    "queryVector": self._query_vector(embedding_vector),
                     "path": "embedding_vector",
-                    "numCandidates": limit * 10,
+                    "numCandidates": _num_candidates(limit),
                     "limit": limit,
                     "index": "vector_search_class",
                 }
@@ -338,7 +590,7 @@ class EmbeddingRepository:
                     "type": 1,
                     "decorators": 1,
                     "docstring": 1,
-                    "embedding_vector": 1,
+                    **({"embedding_vector": 1} if project_embedding else {}),
                     "model": 1,
                     "created_at": 1,
                     "updated_at": 1,
@@ -346,7 +598,7 @@ class EmbeddingRepository:
                 }
             },
         ]
-        return list(self.classes.aggregate(pipeline))
+        return list(self.classes.aggregate(pipeline, **_search_cursor_options(limit)))
 
     def search_code(
         self,
@@ -366,15 +618,25 @@ class EmbeddingRepository:
         Returns:
             Dict[str, List[dict]]: Dictionary containing search results for classes and/or functions.
         """
+        if search_type == "all":
+            # $vectorSearch must be the first stage, so the two searches cannot share one
+            # aggregation; run the class search on a second pooled connection instead.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                classes = executor.submit(self.find_similar_classes, query_vector, limit)
+                functions = self.find_similar_functions(query_vector, function_type=function_type, limit=limit)
+                return {"classes": classes.result(), "functions": functions}
+
         results = {}
-        if search_type in ["all", "classes"]:
+        if search_type == "classes":
             results["classes"] = self.find_similar_classes(query_vector, limit)
-        if search_type in ["all", "functions"]:
+        if search_type == "functions":
             results["functions"] = self.find_similar_functions(
                 query_vector, function_type=function_type, limit=limit
             )
         return results
 
     def close(self):
-        """Closes the MongoDB client connection."""
-        self.client.close()
+        """
+        Kept for compatibility. The MongoClient is shared with other repositories and
+        stays open; use the module-level shutdown() to close all clients.
+        """
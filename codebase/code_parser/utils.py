@@ -1,23 +1,42 @@
 import logging
 import os
-from typing import Optional
+import sys
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _relative_parts(source_file: str, project_root: str) -> List[str]:
+    """
+    Splits source_file into path components relative to project_root.
+
+    Files found by walking the project are plain string extensions of a normalized
+    root, so the common case is a prefix slice; anything else goes through relpath.
+    """
+    prefix = project_root.rstrip(os.sep) + os.sep
+    if source_file.startswith(prefix) and project_root == os.path.normpath(project_root):
+        parts = source_file[len(prefix):].split(os.sep)
+        if not ("" in parts or "." in parts or ".." in parts):
+            return parts
+    return os.path.normpath(os.path.relpath(source_file, project_root)).split(os.sep)
+
+
 def compute_package_full_path(source_file: str, project_root: str) -> str:
     """
     Computes the package full path from a source file relative to the project root.
     """
-    rel_path = os.path.relpath(source_file, project_root)
-    norm_path = os.path.normpath(rel_path)
-    parts = norm_path.split(os.sep)
-    if parts[-1] == "__init__.py":
-        parts = parts[:-1]
+    parts = _relative_parts(source_file, project_root)
+    last = parts[-1]
+    if last == "__init__.py":
+        parts.pop()
+    elif last.endswith(".py"):
+        # Same as splitext for the usual case, without its separator and dot scanning.
+        parts[-1] = last[:-3] or last
     else:
-        parts[-1] = os.path.splitext(parts[-1])[0]
+        parts[-1] = os.path.splitext(last)[0]
     return ".".join(parts)
 
 
@@ -25,9 +44,17 @@ def find_package_source(module_name: str) -> Optional[str]:
     """
     Finds the source file for a given Python module by searching sys.path.
     """
-    import sys
+    return _find_package_source(module_name, tuple(sys.path))
+
 
-    for path in sys.path:
+@lru_cache(maxsize=None)
+def _find_package_source(module_name: str, search_path: Tuple[str, ...]) -> Optional[str]:
+    """
+    Cached lookup behind find_package_source. The same modules are imported from most
+    files of a project, so each is only resolved against the filesystem once per
+    process; the search path is part of the key so changes to sys.path are honoured.
+    """
+    for path in search_path:
         module_path = os.path.join(path, *module_name.split("."))
         file_path = module_path + ".py"
         if os.path.isfile(file_path):
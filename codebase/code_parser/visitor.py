@@ -1,6 +1,10 @@
 import ast
+import inspect
+import logging
 import os
-from typing import List, Dict, Optional, Set
+from functools import lru_cache
+from sys import intern
+from typing import Any, Callable, List, Dict, Optional, Set, Tuple, Union
 
 from codebase.code_parser.utils import (
     compute_package_full_path,
@@ -12,23 +16,96 @@ from codebase.code_graph.models import (
     GraphNode,
     GraphEdge,
     Metadata,
+    NodeBatch,
+    NODE_TYPE_VALUES,
 )  # Import from your module
 
+logger = logging.getLogger(__name__)
+
+
+def _docstring(node: Union[ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef]) -> Optional[str]:
+    """
+    Same result as ``ast.get_docstring(node)``. Most docstrings are a single line
+    without tabs, for which inspect.cleandoc reduces to ``lstrip``, so it is only
+    called for the rest.
+    """
+    if not node.body:
+        return None
+    first = node.body[0]
+    if type(first) is not ast.Expr or type(first.value) is not ast.Constant:
+        return None
+    text = first.value.value
+    if type(text) is not str:
+        return None
+    if "\n" not in text and "\t" not in text:
+        return text.lstrip()
+    return inspect.cleandoc(text)
+
+
+# AST node types that never have children (or visit_* handlers) of interest;
+# generic_visit does not descend into them.
+_LEAF_TYPES = frozenset(
+    {ast.Constant, ast.Name, ast.Load, ast.Store, ast.Del, ast.alias, ast.Pass, ast.Break, ast.Continue,
+     ast.Global, ast.Nonlocal}
+    | {cls for base in (ast.operator, ast.unaryop, ast.cmpop, ast.boolop) for cls in base.__subclasses__()}
+)
+
+
+def _base_name(base: ast.expr) -> str:
+    """
+    Renders a base class expression as source text. Plain (dotted) names, by far the
+    most common bases, are joined directly; anything else goes through ast.unparse.
+    """
+    parts = []
+    current = base
+    while type(current) is ast.Attribute:
+        parts.append(current.attr)
+        current = current.value
+    if type(current) is ast.Name:
+        parts.append(current.id)
+        return ".".join(reversed(parts))
+    try:
+        return ast.unparse(base)
+    except Exception:
+        return str(base)
+
 
 class CodeVisitor(ast.NodeVisitor):
-    def __init__(self, source_file: str, code: str, project_root: str):
+    def __init__(
+        self, source_file: str, code: Union[str, bytes], project_root: str, tree: Optional[ast.Module] = None
+    ):
+        """
+        Prepares a visitor for one module. Pass the already parsed ``tree`` of ``code``
+        when the caller has it, so the source is not parsed a second time here. Without
+        one, the tree parsed here is kept as ``self.tree`` so the caller can run
+        ``visitor.visit(visitor.tree)`` without parsing again; a caller's own tree is not
+        kept, and ``self.tree`` is then None. The source itself is not kept either.
+        """
         if not project_root:
             raise ValueError("project_root must be provided to compute package paths")
 
         self.source_file = source_file
-        self.code = code
         self.project_root = project_root
+        self.tree: Optional[ast.Module] = ast.parse(code) if tree is None else None
         self.graph_nodes: Dict[str, GraphNode] = {}
         self.current_parent_ids: List[str] = []
+        # The function and class entries of current_parent_ids, kept separately so the
+        # innermost of each is a stack top rather than a reverse scan per call.
+        self._function_ids: List[str] = []
+        self._class_ids: List[str] = []
         self.reference_table: Dict[str, Dict[str, str]] = {}
+        # lookup_node results per simple name; dropped whenever that name's entries change.
+        self._best_candidates: Dict[str, str] = {}
         self.imported_module_cache: Dict[str, str] = {}
         self.decorator_mappings: Dict[str, List[str]] = {}  # Track decorators per node
-        self.handled_call_nodes: Set[ast.Call] = set()
+        # (source, target) pairs that already have a CALLS / IMPORTS edge, so repeated
+        # call sites and imports do not append identical edges.
+        self._call_edges: Set[Tuple[str, str]] = set()
+        self._imported_ids: Set[str] = set()
+        # Checked once per module so the per-node trace below costs nothing when off.
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+        # Bound visit_* method (or generic_visit) per AST node class, filled by visit().
+        self._visitors: Dict[type, Callable[[ast.AST], Any]] = {}
 
         # Compute module ID
         filename = os.path.basename(source_file)
@@ -38,27 +115,54 @@ class CodeVisitor(ast.NodeVisitor):
             else os.path.splitext(filename)[0]
         )
         package_full = compute_package_full_path(source_file, project_root)
-        self.module_id = f"module:{package_full}.{simple_name}"
+        self.module_id = intern(f"module:{package_full}.{simple_name}")
 
         # Create module node
-        module_node = GraphNode(
+        module_node = GraphNode.fast(
             id=self.module_id,
             name=simple_name,
             node_type=NodeType.MODULE,
-            metadata=Metadata(source_file=source_file, docstring=ast.get_docstring(ast.parse(code))),
+            metadata=Metadata(source_file=source_file, docstring=_docstring(tree or self.tree)),
         )
         self.graph_nodes[self.module_id] = module_node
         self.update_reference_table(module_node)
         self.current_parent_ids.append(self.module_id)
-        print(f"[__init__] Initialized CodeVisitor for module_id: {self.module_id}")
+        if self._debug:
+            logger.debug("[__init__] Initialized CodeVisitor for module_id: %s", self.module_id)
+
+    def visit(self, node: ast.AST) -> Any:
+        """Visits a node, resolving the visit_* method once per node class instead of per node."""
+        cls = node.__class__
+        visitor = self._visitors.get(cls)
+        if visitor is None:
+            visitor = self._visitors[cls] = getattr(self, "visit_" + cls.__name__, self.generic_visit)
+        return visitor(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        """Visits a node's children like ast.NodeVisitor.generic_visit, skipping leaf nodes."""
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if type(value) is list:
+                for item in value:
+                    if type(item) not in _LEAF_TYPES and isinstance(item, ast.AST):
+                        self.visit(item)
+            elif type(value) not in _LEAF_TYPES and isinstance(value, ast.AST):
+                self.visit(value)
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _package_of(node_id: str) -> str:
+        """Returns the dotted path a node id's last component lives in ("" if untyped)."""
+        try:
+            _, full = node_id.split(":", 1)
+        except ValueError:
+            return ""
+        return intern(full.rsplit(".", 1)[0])
 
     def update_reference_table(self, node: GraphNode) -> None:
         """Ensures reference table only updates when necessary."""
-        try:
-            _, full = node.id.split(":", 1)
-            package = full.rsplit(".", 1)[0]
-        except ValueError:
-            package = ""
+        package = self._package_of(node.id)
+        self._best_candidates.pop(node.name, None)
 
         if node.name not in self.reference_table:
             self.reference_table[node.name] = {}
@@ -68,44 +172,37 @@ class CodeVisitor(ast.NodeVisitor):
             existing_node = self.graph_nodes[existing_node_id]
             # Keep the existing node if it has better metadata
             if existing_node.metadata and existing_node.metadata.source_file:
-                print(f"[update_reference_table] Skipping '{node.name}' update: existing node has better metadata.")
+                if self._debug:
+                    logger.debug(
+                        "[update_reference_table] Skipping '%s' update: existing node has better metadata.", node.name
+                    )
                 return
 
         self.reference_table[node.name][package] = node.id
-        print(f"[update_reference_table] Added '{node.id}' for '{node.name}' in package '{package}'")
+        if self._debug:
+            logger.debug("[update_reference_table] Added '%s' for '%s' in package '%s'", node.id, node.name, package)
 
     def compute_node_id(self, node_type: NodeType, name: str) -> str:
         """Computes a unique node ID based on its type and parent context."""
         if not self.current_parent_ids:
-            print("[compute_node_id] Warning: No parent found, using module as fallback.")
-            return f"{node_type.value}:{self.module_id}.{name}"
+            logger.warning("[compute_node_id] No parent found, using module as fallback.")
+            return f"{NODE_TYPE_VALUES[node_type]}:{self.module_id}.{name}"
 
-        parent_id = self.current_parent_ids[-1]
-        try:
-            _, full = parent_id.split(":", 1)
-            package_path = full.rsplit(".", 1)[0]
-        except ValueError:
-            package_path = ""
+        package_path = self._package_of(self.current_parent_ids[-1])
 
-        computed_id = f"{node_type.value}:{package_path}.{name}"
-        print(f"[compute_node_id] Computed node id '{computed_id}'")
+        computed_id = intern(f"{NODE_TYPE_VALUES[node_type]}:{package_path}.{name}")
+        if self._debug:
+            logger.debug("[compute_node_id] Computed node id '%s'", computed_id)
         return computed_id
 
     def add_node(self, node: GraphNode) -> None:
         """Adds a node to the graph and updates references."""
-        node_data = node.model_dump()
-        node_data["node_type"] = node.node_type.value
-
-        for rel in node_data.get("relationships", []):
-            if isinstance(rel.get("edge_type"), EdgeType):
-                rel["edge_type"] = rel["edge_type"].value
-
         self.graph_nodes[node.id] = node
         self.update_reference_table(node)
 
         if self.current_parent_ids:
             parent_id = self.current_parent_ids[-1]
-            contains_edge = GraphEdge(
+            contains_edge = GraphEdge.fast(
                 edge_type=EdgeType.CONTAINS,
                 source_node_id=parent_id,
                 target_node_id=node.id,
@@ -114,34 +211,53 @@ class CodeVisitor(ast.NodeVisitor):
             )
             self.graph_nodes[parent_id].relationships.append(contains_edge)
 
-    def visit_Import(self, node: ast.Import):
-        """Handles module imports and updates the graph."""
-        for alias in node.names:
-            imported_module = alias.name
-            imported_module_id = self.imported_module_cache.get(imported_module, f"module:{imported_module}")
+    def _add_import(self, imported_module: str) -> None:
+        """Adds the node of an imported module (once) and the IMPORTS edge to it (once)."""
+        imported_module_id = self.imported_module_cache.get(imported_module)
+        if imported_module_id is None:
+            imported_module_id = intern(f"module:{imported_module}")
             self.imported_module_cache[imported_module] = imported_module_id
 
+        graph_nodes = self.graph_nodes
+        if imported_module_id not in graph_nodes:
             # Use find_package_source to locate the module's source file if available.
-            module_source_file = find_package_source(imported_module)
-
-            if imported_module_id not in self.graph_nodes:
-                self.graph_nodes[imported_module_id] = GraphNode(
-                    id=imported_module_id,
-                    name=imported_module,
-                    node_type=NodeType.MODULE,
-                    metadata=Metadata(source_file=module_source_file, docstring=None),
-                )
-                self.update_reference_table(self.graph_nodes[imported_module_id])
-
-            self.graph_nodes[self.module_id].relationships.append(
-                GraphEdge(
-                    edge_type=EdgeType.IMPORTS,
-                    source_node_id=self.module_id,
-                    target_node_id=imported_module_id,
-                    source_node_type=NodeType.MODULE,
-                    target_node_type=NodeType.MODULE,
-                )
+            imported_node = graph_nodes[imported_module_id] = GraphNode.fast(
+                id=imported_module_id,
+                name=imported_module,
+                node_type=NodeType.MODULE,
+                metadata=Metadata(source_file=find_package_source(imported_module), docstring=None),
             )
+            self.update_reference_table(imported_node)
+
+        if imported_module_id in self._imported_ids:
+            return
+        self._imported_ids.add(imported_module_id)
+        graph_nodes[self.module_id].relationships.append(
+            GraphEdge.fast(
+                edge_type=EdgeType.IMPORTS,
+                source_node_id=self.module_id,
+                target_node_id=imported_module_id,
+                source_node_type=NodeType.MODULE,
+                target_node_type=NodeType.MODULE,
+            )
+        )
+
+    def visit_Import(self, node: ast.Import):
+        """Handles module imports and updates the graph."""
+        for alias in node.names:
+            self._add_import(alias.name)
+
+    def _resolve_relative(self, module: Optional[str], level: int) -> str:
+        """
+        Returns the absolute name of the module an ImportFrom with this ``module`` and
+        ``level`` refers to. Pure string math on the current module id: sys.path and
+        the import machinery are not consulted.
+        """
+        if level == 0:
+            return module or ""
+        # Navigate up 'level' levels from the current module's package parts.
+        base = ".".join(self.module_id.partition(":")[2].split(".")[:-level])
+        return base + ("." + module if module else "")
 
     def visit_ImportFrom(self, node: ast.ImportFrom):
         """
@@ -150,19 +266,7 @@ class CodeVisitor(ast.NodeVisitor):
         uses find_package_source to locate the module's source file, and adds
         an IMPORTS edge from the current module to the imported module.
         """
-        # Compute the base module name, taking into account relative import levels.
-        if node.level > 0:
-            try:
-                # Extract the package parts from the current module id.
-                _, full = self.module_id.split(":", 1)
-                package_parts = full.split(".")
-            except Exception:
-                package_parts = []
-            # Navigate up 'node.level' levels.
-            base = ".".join(package_parts[: -node.level])
-            base_module = base + ("." + node.module if node.module else "")
-        else:
-            base_module = node.module if node.module else ""
+        base_module = self._resolve_relative(node.module, node.level)
 
         for alias in node.names:
             # Form the full module name by appending the alias.
@@ -171,29 +275,7 @@ class CodeVisitor(ast.NodeVisitor):
             else:
                 imported_module = alias.name
 
-            imported_module_id = self.imported_module_cache.get(imported_module, f"module:{imported_module}")
-            self.imported_module_cache[imported_module] = imported_module_id
-
-            # Use the helper to find the source file for the module.
-            module_source_file = find_package_source(imported_module)
-            if imported_module_id not in self.graph_nodes:
-                self.graph_nodes[imported_module_id] = GraphNode(
-                    id=imported_module_id,
-                    name=imported_module,
-                    node_type=NodeType.MODULE,
-                    metadata=Metadata(source_file=module_source_file, docstring=None),
-                )
-                self.update_reference_table(self.graph_nodes[imported_module_id])
-
-            self.graph_nodes[self.module_id].relationships.append(
-                GraphEdge(
-                    edge_type=EdgeType.IMPORTS,
-                    source_node_id=self.module_id,
-                    target_node_id=imported_module_id,
-                    source_node_type=NodeType.MODULE,
-                    target_node_type=NodeType.MODULE,
-                )
-            )
+            self._add_import(imported_module)
         self.generic_visit(node)
 
     def visit_ClassDef(self, node: ast.ClassDef):
@@ -203,7 +285,10 @@ class CodeVisitor(ast.NodeVisitor):
         # Check if the class already exists in the reference table
         existing_node_id = self.lookup_node(node.name)
         if existing_node_id:
-            print(f"[visit_ClassDef] Using existing node '{existing_node_id}' instead of creating '{class_id}'")
+            if self._debug:
+                logger.debug(
+                    "[visit_ClassDef] Using existing node '%s' instead of creating '%s'", existing_node_id, class_id
+                )
             return
 
         # Check if the class defines __call__
@@ -212,15 +297,9 @@ class CodeVisitor(ast.NodeVisitor):
         )
 
         # Extract base classes
-        base_classes = []
-        for base in node.bases:
-            try:
-                base_str = ast.unparse(base) if hasattr(ast, "unparse") else str(base)
-            except Exception:
-                base_str = str(base)
-            base_classes.append(base_str)
-
-        class_node = GraphNode(
+        base_classes = [_base_name(base) for base in node.bases]
+
+        class_node = GraphNode.fast(
             id=class_id,
             name=node.name,
             node_type=NodeType.CLASS,
@@ -228,7 +307,7 @@ class CodeVisitor(ast.NodeVisitor):
                 source_file=self.source_file,
                 line_start=node.lineno,
                 line_end=getattr(node, "end_lineno", None),
-                docstring=ast.get_docstring(node),
+                docstring=_docstring(node),
                 additional={"base_classes": base_classes, "is_callable": is_callable},  # Store base classes in metadata
             ),
         )
@@ -237,6 +316,7 @@ class CodeVisitor(ast.NodeVisitor):
 
         # Ensure methods and attributes are associated with this class
         self.current_parent_ids.append(class_id)
+        self._class_ids.append(class_id)
 
         # Handle decorators first to establish DECORATES relationships
         self.handle_decorators(node, class_id)
@@ -246,6 +326,7 @@ class CodeVisitor(ast.NodeVisitor):
 
         # Restore parent context after processing the class
         self.current_parent_ids.pop()
+        self._class_ids.pop()
 
     def visit_FunctionDef(self, node: ast.FunctionDef):
         """Handles function definitions and ensures methods belong to their parent class if applicable."""
@@ -260,11 +341,16 @@ class CodeVisitor(ast.NodeVisitor):
         # Check if the function already exists in the reference table
         existing_node_id = self.lookup_node(node.name)
         if existing_node_id:
-            print(f"[visit_FunctionDef] Using existing node '{existing_node_id}' instead of creating '{function_id}'")
+            if self._debug:
+                logger.debug(
+                    "[visit_FunctionDef] Using existing node '%s' instead of creating '%s'",
+                    existing_node_id,
+                    function_id,
+                )
             return
 
         # Create function/method node
-        function_node = GraphNode(
+        function_node = GraphNode.fast(
             id=function_id,
             name=node.name,
             node_type=NodeType.FUNCTION,
@@ -272,7 +358,7 @@ class CodeVisitor(ast.NodeVisitor):
                 source_file=self.source_file,
                 line_start=node.lineno,
                 line_end=getattr(node, "end_lineno", None),
-                docstring=ast.get_docstring(node),
+                docstring=_docstring(node),
             ),
         )
 
@@ -280,7 +366,7 @@ class CodeVisitor(ast.NodeVisitor):
 
         # Set method-parent association
         if is_method:
-            method_edge = GraphEdge(
+            method_edge = GraphEdge.fast(
                 edge_type=EdgeType.CONTAINS,
                 source_node_id=parent_id,  # The class containing the method
                 target_node_id=function_id,
@@ -291,6 +377,7 @@ class CodeVisitor(ast.NodeVisitor):
 
         # Mark the function as the current parent (for possible nested functions)
         self.current_parent_ids.append(function_id)
+        self._function_ids.append(function_id)
 
         # Handle decorators before processing function body
         self.handle_decorators(node, function_id)
@@ -300,36 +387,34 @@ class CodeVisitor(ast.NodeVisitor):
 
         # Restore parent context after processing function
         self.current_parent_ids.pop()
+        self._function_ids.pop()
 
     def visit_Call(self, node: ast.Call):
         """Handles function/method calls and ensures calls to callable classes are tracked."""
-        if node in self.handled_call_nodes:
-            return self.generic_visit(node)
-
-        caller_id = next(
-            (p for p in reversed(self.current_parent_ids) if p.startswith("function:")),
-            self.module_id,
-        )
+        caller_id = self._function_ids[-1] if self._function_ids else self.module_id
         called_function_id = None
 
-        if isinstance(node.func, ast.Name):
+        # AST node classes are never subclassed, so exact type checks suffice.
+        func = node.func
+        func_type = type(func)
+        if func_type is ast.Name:
             # Check if function name refers to a callable class
-            possible_class_id = self.lookup_node(node.func.id) or self.compute_node_id(NodeType.CLASS, node.func.id)
+            possible_class_id = self.lookup_node(func.id) or self.compute_node_id(NodeType.CLASS, func.id)
 
             if possible_class_id in self.graph_nodes and self.graph_nodes[possible_class_id].metadata:
                 node_metadata = self.graph_nodes[possible_class_id].metadata
                 if node_metadata.additional and node_metadata.additional.get("is_callable"):
                     called_function_id = possible_class_id  # Redirect call to the class itself
                 else:
-                    called_function_id = self.lookup_node(node.func.id) or self.compute_node_id(NodeType.FUNCTION, node.func.id)
+                    called_function_id = self.lookup_node(func.id) or self.compute_node_id(NodeType.FUNCTION, func.id)
 
-        elif isinstance(node.func, ast.Attribute):
+        elif func_type is ast.Attribute:
             # Handle method calls (e.g., `obj.method()`)
-            attr_name = node.func.attr
-            obj_name = node.func.value.id if isinstance(node.func.value, ast.Name) else None
+            attr_name = func.attr
+            obj_name = func.value.id if type(func.value) is ast.Name else None
 
             if obj_name and obj_name in ("self", "cls"):  # Likely a method on the same class
-                parent_class_id = next((p for p in reversed(self.current_parent_ids) if p.startswith("class:")), None)
+                parent_class_id = self._class_ids[-1] if self._class_ids else None
                 if parent_class_id:
                     called_function_id = f"function:{parent_class_id.split(':', 1)[1]}.{attr_name}"
             else:
@@ -341,9 +426,10 @@ class CodeVisitor(ast.NodeVisitor):
                     if node_metadata and node_metadata.additional and node_metadata.additional.get("is_callable"):
                         called_function_id = possible_class_id  # Redirect call to the class itself
 
-        if called_function_id:
+        if called_function_id and (caller_id, called_function_id) not in self._call_edges:
+            self._call_edges.add((caller_id, called_function_id))
             self.graph_nodes[caller_id].relationships.append(
-                GraphEdge(
+                GraphEdge.fast(
                     edge_type=EdgeType.CALLS,
                     source_node_id=caller_id,
                     target_node_id=called_function_id,
@@ -360,15 +446,16 @@ class CodeVisitor(ast.NodeVisitor):
             return
 
         for decorator in node.decorator_list:
-            if isinstance(decorator, ast.Name):
+            decorator_type = type(decorator)
+            if decorator_type is ast.Name:
                 decorator_name = decorator.id
                 full_decorator_id = self.lookup_node(decorator_name) or self.compute_node_id(
                     NodeType.FUNCTION, decorator_name
                 )
 
-            elif isinstance(decorator, ast.Attribute):
+            elif decorator_type is ast.Attribute:
                 decorator_name = decorator.attr
-                obj_name = decorator.value.id if isinstance(decorator.value, ast.Name) else None
+                obj_name = decorator.value.id if type(decorator.value) is ast.Name else None
                 full_decorator_id = self.lookup_node(f"{obj_name}.{decorator_name}") or self.compute_node_id(
                     NodeType.FUNCTION, decorator_name
                 )
@@ -379,7 +466,7 @@ class CodeVisitor(ast.NodeVisitor):
             # Determine target type based on its ID prefix
             target_node_type = NodeType.FUNCTION if target_id.startswith("function:") else NodeType.CLASS
 
-            decorates_edge = GraphEdge(
+            decorates_edge = GraphEdge.fast(
                 edge_type=EdgeType.DECORATES,
                 source_node_id=full_decorator_id,
                 target_node_id=target_id,
@@ -392,26 +479,32 @@ class CodeVisitor(ast.NodeVisitor):
         """Returns all collected graph nodes."""
         return list(self.graph_nodes.values())
 
+    def get_graph_batch(self) -> NodeBatch:
+        """Returns all collected graph nodes in column-oriented form."""
+        return NodeBatch.from_nodes(self.graph_nodes.values())
+
     def lookup_node(self, simple_name: str) -> Optional[str]:
         """Looks up a node ID by its simple name using the reference table."""
+        best_id = self._best_candidates.get(simple_name)
+        if best_id is not None:
+            return best_id
+
         candidates = self.reference_table.get(simple_name, {})
         if not candidates:
-            print(f"[lookup_node] No candidates found for '{simple_name}'")
+            if self._debug:
+                logger.debug("[lookup_node] No candidates found for '%s'", simple_name)
             return None
 
-        best_id = None
-        best_score = -1
-
-        for package, node_id in candidates.items():
-            node = self.graph_nodes.get(node_id)
-            score = 1 if (node and node.metadata and node.metadata.source_file) else 0
-
+        def rank(package: str):
             # ✅ Prefer nodes with metadata, and prioritize shorter package paths
-            if score > best_score or (
-                score == best_score and (best_id is None or package < best_id.split(":", 1)[1].rsplit(".", 1)[0])
-            ):
-                best_score = score
-                best_id = node_id
-
-        print(f"[lookup_node] Resolved '{simple_name}' to '{best_id}' with score {best_score}")
+            node = self.graph_nodes.get(candidates[package])
+            has_metadata = bool(node and node.metadata and node.metadata.source_file)
+            return (not has_metadata, package)
+
+        best_rank = min(map(rank, candidates))
+        best_id = self._best_candidates[simple_name] = candidates[best_rank[1]]
+        if self._debug:
+            logger.debug(
+                "[lookup_node] Resolved '%s' to '%s' with score %s", simple_name, best_id, int(not best_rank[0])
+            )
         return best_id
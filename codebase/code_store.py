@@ -16,9 +16,12 @@ Command:
     ```
 """
 
+import asyncio
 import os
+from typing import Any, Dict, Iterator, List, Tuple
+
 import networkx as nx
-from neo4j import GraphDatabase, Driver
+from neo4j import AsyncDriver, GraphDatabase, Driver
 import logging
 
 # Neo4j driver initialization (no auth version)
@@ -49,52 +52,91 @@ def create_project_database(driver: Driver, project_name: str) -> None:
             session.run(f"CREATE DATABASE {project_name}")
             logging.info(f"Database '{project_name}' has been created.")
 
+# Rows sent per UNWIND query; one round-trip per batch instead of one per item.
+BATCH_SIZE = 10_000
+
+
+def _batches(rows: List[Any], size: int = BATCH_SIZE) -> Iterator[List[Any]]:
+    """Yields consecutive slices of at most ``size`` rows."""
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+NODE_ID_CONSTRAINT_QUERY = "CREATE CONSTRAINT node_id_unique IF NOT EXISTS FOR (n:Node) REQUIRE n.id IS UNIQUE"
+
+# Databases whose Node(id) constraint has been ensured by this process.
+_constrained_databases = set()
+
+
+def ensure_node_id_constraint(driver: Driver, database: str = "neo4j") -> None:
+    """
+    Creates the uniqueness constraint on Node.id (and with it the index every
+    MERGE/MATCH on id relies on) once per database and process.
+    """
+    if database in _constrained_databases:
+        return
+    with driver.session(database=database) as session:
+        session.run(NODE_ID_CONSTRAINT_QUERY).consume()
+    _constrained_databases.add(database)
+
 # -----------------------------------------------------------------------------
 # Merge (store/update) functions for nodes and edges.
 # -----------------------------------------------------------------------------
+MERGE_NODES_QUERY = """
+UNWIND $rows AS row
+MERGE (n:Node {id: row.id})
+ON MATCH SET n.name = coalesce(row.name, n.name),
+              n.node_type = coalesce(row.node_type, n.node_type),
+              n.data_type = coalesce(row.data_type, n.data_type),
+              n.parent_id = coalesce(row.parent_id, n.parent_id),
+              n.docstring = coalesce(row.docstring, n.docstring),
+              n.file = coalesce(row.file, n.file)
+ON CREATE SET n.name = row.name,
+              n.node_type = row.node_type,
+              n.data_type = row.data_type,
+              n.parent_id = row.parent_id,
+              n.docstring = row.docstring,
+              n.file = row.file
+"""
+
+MERGE_EDGES_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Node {id: row.source})
+MATCH (b:Node {id: row.destination})
+MERGE (a)-[r:RELATION {source: row.source, destination: row.destination}]->(b)
+ON MATCH SET r.op = coalesce(row.op, r.op)
+ON CREATE SET r.op = row.op
+"""
+
+
+def _node_rows(nx_graph: nx.DiGraph) -> List[Dict[str, Any]]:
+    """Parameter rows for MERGE_NODES_QUERY."""
+    return [
+        {
+            "id": node_id,
+            "name": data.get("name"),
+            "node_type": data.get("type"),
+            "data_type": data.get("data_type", "Unknown"),
+            "parent_id": data.get("parent_id", ""),
+            "docstring": data.get("docstring", ""),
+            "file": data.get("file", ""),
+        }
+        for node_id, data in nx_graph.nodes(data=True)
+    ]
+
+def _edge_rows(nx_graph: nx.DiGraph) -> List[Dict[str, Any]]:
+    """Parameter rows for MERGE_EDGES_QUERY."""
+    return [
+        {"source": source, "destination": destination, "op": data.get("op", "")}
+        for source, destination, data in nx_graph.edges(data=True)
+    ]
+
 def store_graph_in_neo4j(tx, nx_graph: nx.DiGraph):
     # Merge/update nodes.
-    for node_id, data in nx_graph.nodes(data=True):
-        query = """
-        MERGE (n:Node {id: $id})
-        ON MATCH SET n.name = coalesce($name, n.name),
-                      n.node_type = coalesce($node_type, n.node_type),
-                      n.data_type = coalesce($data_type, n.data_type),
-                      n.parent_id = coalesce($parent_id, n.parent_id),
-                      n.docstring = coalesce($docstring, n.docstring),
-                      n.file = coalesce($file, n.file)
-        ON CREATE SET n.name = $name,
-                      n.node_type = $node_type,
-                      n.data_type = $data_type,
-                      n.parent_id = $parent_id,
-                      n.docstring = $docstring,
-                      n.file = $file
-        """
-        tx.run(
-            query,
-            id=node_id,
-            name=data.get("name"),
-            node_type=data.get("type"),
-            data_type=data.get("data_type", "Unknown"),
-            parent_id=data.get("parent_id", ""),
-            docstring=data.get("docstring", ""),
-            file=data.get("file", "")
-        )
+    for batch in _batches(_node_rows(nx_graph)):
+        tx.run(MERGE_NODES_QUERY, rows=batch)
     # Merge/update edges.
-    for source, destination, data in nx_graph.edges(data=True):
-        query = """
-        MATCH (a:Node {id: $source})
-        MATCH (b:Node {id: $destination})
-        MERGE (a)-[r:RELATION {source: $source, destination: $destination}]->(b)
-        ON MATCH SET r.op = coalesce($op, r.op)
-        ON CREATE SET r.op = $op
-        """
-        tx.run(
-            query,
-            source=source,
-            destination=destination,
-            op=data.get("op", "")
-        )
+    for batch in _batches(_edge_rows(nx_graph)):
+        tx.run(MERGE_EDGES_QUERY, rows=batch)
 
 # -----------------------------------------------------------------------------
 # Functions to retrieve existing nodes and edges.
@@ -126,10 +168,28 @@ def delete_edge(tx, source: str, destination: str):
     """
     tx.run(query, source=source, destination=destination)
 
+DELETE_NODES_NOT_IN_QUERY = "MATCH (n:Node) WHERE NOT n.id IN $ids DETACH DELETE n"
+
+# Merged edges carry the op of new_graph, so matching on endpoints alone is enough.
+DELETE_EDGES_NOT_IN_QUERY = """
+MATCH (:Node)-[r:RELATION]->(:Node)
+WHERE NOT [r.source, r.destination] IN $pairs
+DELETE r
+"""
+
+def delete_nodes_not_in(tx, node_ids: List[str]):
+    """Detaches and deletes every node whose id is not in node_ids."""
+    tx.run(DELETE_NODES_NOT_IN_QUERY, ids=node_ids)
+
+def delete_edges_not_in(tx, pairs: List[Tuple[str, str]]):
+    """Deletes every relation whose (source, destination) is not in pairs."""
+    tx.run(DELETE_EDGES_NOT_IN_QUERY, pairs=[list(pair) for pair in pairs])
+
 # -----------------------------------------------------------------------------
 # High-level functions for storing and synchronizing the graph.
 # -----------------------------------------------------------------------------
 def store_networkx_graph(nx_graph: nx.DiGraph, driver):
+    ensure_node_id_constraint(driver)
     with driver.session() as session:
         session.execute_write(store_graph_in_neo4j, nx_graph)
     print("Graph stored in Neo4j successfully.")
@@ -148,23 +208,69 @@ def sync_graph(new_graph: nx.DiGraph, driver: Driver, project_name: str) -> None
     # Ensure the project-specific database exists.
     # create_project_database(driver, project_name)
 
+    ensure_node_id_constraint(driver, "neo4j")
+
     # Open a session on the project-specific database.
     with driver.session(database="neo4j") as session:
         # Merge/update nodes and edges.
         session.execute_write(store_graph_in_neo4j, new_graph)
 
-        # Delete nodes not in new_graph.
-        existing_node_ids = session.execute_read(get_existing_node_ids)
-        new_node_ids = set(new_graph.nodes())
-        nodes_to_delete = existing_node_ids - new_node_ids
-        for node_id in nodes_to_delete:
-            session.execute_write(delete_node, node_id)
-
-        # Delete edges not in new_graph.
-        existing_edges = session.execute_read(get_existing_edges)
-        new_edges = {(s, d, data.get("op", "")) for s, d, data in new_graph.edges(data=True)}
-        edges_to_delete = existing_edges - new_edges
-        for source, destination, _ in edges_to_delete:
-            session.execute_write(delete_edge, source, destination)
+        # Delete nodes and edges not in new_graph. The diff runs server-side, so the
+        # existing graph is never transferred back to the client.
+        session.execute_write(delete_nodes_not_in, list(new_graph.nodes()))
+        session.execute_write(delete_edges_not_in, list(new_graph.edges()))
 
         print("Graph synchronized with Neo4j.")
+
+
+# -----------------------------------------------------------------------------
+# Asynchronous synchronization.
+# -----------------------------------------------------------------------------
+# Write transactions sync_graph_async keeps in flight at once.
+ASYNC_WRITE_CONCURRENCY = 4
+
+async def _run_batch_async(tx, query: str, rows: List[Any]) -> None:
+    result = await tx.run(query, rows=rows)
+    await result.consume()
+
+async def _delete_stale_async(tx, node_ids: List[str], pairs: List[Tuple[str, str]]) -> None:
+    result = await tx.run(DELETE_NODES_NOT_IN_QUERY, ids=node_ids)
+    await result.consume()
+    result = await tx.run(DELETE_EDGES_NOT_IN_QUERY, pairs=[list(pair) for pair in pairs])
+    await result.consume()
+
+async def sync_graph_async(new_graph: nx.DiGraph, driver: AsyncDriver, database: str = "neo4j") -> None:
+    """
+    Asynchronous counterpart of sync_graph for a neo4j.AsyncDriver.
+
+    Up to ASYNC_WRITE_CONCURRENCY batch transactions are in flight at once, so
+    round-trips overlap instead of running back to back. Each batch is its own
+    transaction; edges are merged once every node batch has committed, and stale
+    nodes and edges are deleted last.
+
+    Args:
+        new_graph (nx.DiGraph): The new code graph.
+        driver (neo4j.AsyncDriver): The asynchronous Neo4j driver.
+        database (str, optional): Database to synchronize. Defaults to "neo4j".
+    """
+    async with driver.session(database=database) as session:
+        result = await session.run(NODE_ID_CONSTRAINT_QUERY)
+        await result.consume()
+
+    semaphore = asyncio.Semaphore(ASYNC_WRITE_CONCURRENCY)
+
+    async def write(query: str, rows: List[Any]) -> None:
+        async with semaphore:
+            async with driver.session(database=database) as session:
+                await session.execute_write(_run_batch_async, query, rows)
+
+    def writes(query: str, rows: List[Any]):
+        return [write(query, batch) for batch in _batches(rows)]
+
+    await asyncio.gather(*writes(MERGE_NODES_QUERY, _node_rows(new_graph)))
+    await asyncio.gather(*writes(MERGE_EDGES_QUERY, _edge_rows(new_graph)))
+
+    # Stale nodes and edges are found server-side, as in sync_graph.
+    async with driver.session(database=database) as session:
+        await session.execute_write(_delete_stale_async, list(new_graph.nodes()), list(new_graph.edges()))
+    logging.info("Graph synchronized with Neo4j.")
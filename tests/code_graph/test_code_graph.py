@@ -1,3 +1,6 @@
+import io
+import json
+
 from codebase.code_graph.graph import CodeGraph
 from codebase.code_graph.models import GraphNode, GraphEdge, NodeType, EdgeType, Metadata
 
@@ -90,6 +93,36 @@ def test_to_dict():
     assert "links" in d or "edges" in d
 
 
+def test_fast_node_defaults_match_validated_node():
+    """Test that GraphNode.fast fills in the same defaults as a validated GraphNode."""
+    fast = GraphNode.fast(id="function:dummy.func1", name="func1", node_type=NodeType.FUNCTION)
+    node = GraphNode(id="function:dummy.func1", name="func1", node_type=NodeType.FUNCTION)
+    assert fast.to_graph_data() == node.to_graph_data()
+
+
+def test_to_json_stream_matches_bytes():
+    """Streaming to_json into a file object writes the same document as to_json()."""
+    cg = CodeGraph()
+    node1 = create_test_node("function:dummy.func1", "func1", "dummy.py")
+    node2 = create_test_node("function:dummy.func2", "func2", "dummy.py")
+    cg.add_node(node1)
+    cg.add_node(node2)
+    cg.add_edge(
+        node1.id,
+        GraphEdge(
+            edge_type=EdgeType.CALLS,
+            source_node_id=node1.id,
+            target_node_id=node2.id,
+            source_node_type=NodeType.FUNCTION,
+            target_node_type=NodeType.FUNCTION,
+        ),
+    )
+    buffer = io.BytesIO()
+    assert cg.to_json(buffer) is None
+    assert buffer.getvalue() == cg.to_json()
+    assert json.loads(buffer.getvalue())["links"][0]["relationship"] == "calls"
+
+
 def test_merge_nodes_by_reference():
     """Test that merge_nodes_by_reference merges nodes with the same simple name."""
     cg = CodeGraph()
@@ -130,3 +163,23 @@ def test_merge_nodes_by_reference():
     # No edge should target the removed node2.
     for _, v in graph_after.edges():
         assert v != node2.id
+
+
+def test_duplicate_edges_follow_graph_edges():
+    """Test that duplicate edges are skipped based on the edges currently in the graph."""
+    cg = CodeGraph()
+    cg.add_node(create_test_node("function:dummy.a", "a", "dummy.py"))
+    cg.add_node(create_test_node("function:dummy.b", "b", "dummy.py"))
+
+    cg.add_edges_data([("function:dummy.a", "function:dummy.b", "calls")] * 2)
+    assert cg.graph.number_of_edges() == 1
+
+    # A different relationship replaces the edge, as DiGraph.add_edge would.
+    cg.add_edges_data([("function:dummy.a", "function:dummy.b", "uses")])
+    cg.add_edges_data([("function:dummy.a", "function:dummy.b", "calls")])
+    assert list(cg.graph.edges(data="relationship")) == [("function:dummy.a", "function:dummy.b", "calls")]
+
+    # Edges removed through the public graph can be added again.
+    cg.graph.remove_edge("function:dummy.a", "function:dummy.b")
+    cg.add_edges_data([("function:dummy.a", "function:dummy.b", "calls")])
+    assert cg.graph.has_edge("function:dummy.a", "function:dummy.b")
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from codebase.code_graph import parse_cache, utils
+from codebase.code_graph.models import NodeBatch
+from codebase.code_graph.parse_cache import ParseCache
+
+
+def test_parse_cache_hit_and_invalidation(tmp_path):
+    """Test that cached batches are returned until the file's stat changes."""
+    source = tmp_path / "mod.py"
+    source.write_text("x = 1\n")
+    batch = NodeBatch(ids=["module:mod"], node_data=[{"id": "module:mod", "name": "mod"}])
+
+    cache = ParseCache(str(tmp_path), cache_dir=tmp_path / "cache")
+    assert cache.load([str(source)]) == {}
+    cache.store(str(source), batch)
+    cache.close()
+
+    cache = ParseCache(str(tmp_path), cache_dir=tmp_path / "cache")
+    assert cache.load([str(source)]) == {str(source): batch}
+
+    source.write_text("x = 12\n")
+    os.utime(source, ns=(0, 0))
+    assert cache.load([str(source)]) == {}
+    cache.close()
+
+
+def test_parse_cache_content_hash_fallback(tmp_path):
+    """Test that a touched but unchanged file is still a hit, and an edited one is not."""
+    source = tmp_path / "mod.py"
+    source.write_text("x = 1\n")
+    batch = NodeBatch(ids=["module:mod"], node_data=[{"id": "module:mod", "name": "mod"}])
+
+    cache = ParseCache(str(tmp_path), cache_dir=tmp_path / "cache")
+    cache.load([str(source)])
+    cache.store(str(source), batch)
+    cache.close()
+
+    os.utime(source, ns=(0, 0))
+    cache = ParseCache(str(tmp_path), cache_dir=tmp_path / "cache")
+    assert cache.load([str(source)]) == {str(source): batch}
+    cache.close()
+
+    source.write_text("x = 2\n")
+    os.utime(source, ns=(1, 1))
+    cache = ParseCache(str(tmp_path), cache_dir=tmp_path / "cache")
+    assert cache.load([str(source)]) == {}
+    cache.close()
+
+
+def test_build_project_graph_commits_cache_on_failure(tmp_path, monkeypatch):
+    """Test that results stored before a failing file are committed when the build raises."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "big.py").write_text("def big():\n    return 1\n")
+    (project / "bad.py").write_text("x = 1\n")
+    monkeypatch.setattr(parse_cache, "PARSE_CACHE_DIR", tmp_path / "cache")
+
+    parse = utils._parse_project_file
+
+    def failing_parse(filepath, project_root):
+        if filepath.endswith("bad.py"):
+            raise RuntimeError("worker failed")
+        return parse(filepath, project_root)
+
+    monkeypatch.setattr(utils, "_parse_project_file", failing_parse)
+    with pytest.raises(RuntimeError):
+        utils.build_project_graph(str(project), use_cache=True)
+
+    cache = ParseCache(str(project))
+    assert list(cache.load([str(project / "big.py"), str(project / "bad.py")])) == [str(project / "big.py")]
+    cache.close()
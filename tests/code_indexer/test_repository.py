@@ -0,0 +1,105 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from codebase.code_indexer.models import ClassDocumentModel
+from codebase.code_indexer.repository import EmbeddingRepository
+
+
+class FakeCollection:
+    """In-memory stand-in for the parts of a pymongo Collection that store_embeddings uses."""
+
+    def __init__(self):
+        self.docs = []
+
+    def _matches(self, doc, filter_criteria):
+        return all(doc.get(key) == value for key, value in filter_criteria.items())
+
+    def bulk_write(self, ops, ordered):
+        upserted_ids = {}
+        for index, op in enumerate(ops):
+            existing = next((doc for doc in self.docs if self._matches(doc, op._filter)), None)
+            if existing is not None:
+                existing.update(op._doc["$set"])
+            else:
+                doc = {**op._filter, **op._doc["$set"], **op._doc["$setOnInsert"]}
+                self.docs.append(doc)
+                upserted_ids[index] = doc["_id"]
+        return SimpleNamespace(acknowledged=True, upserted_ids=upserted_ids)
+
+    def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if not any(self._matches(doc, f) for f in query["$or"])]
+
+    def insert_many(self, documents, ordered):
+        keys = [(doc["package"], doc["name"]) for doc in self.docs + documents]
+        if len(keys) != len(set(keys)):
+            raise ValueError("E11000 duplicate key error")
+        self.docs.extend(documents)
+
+    def find(self, query, projection=None):
+        return [doc for doc in self.docs if any(self._matches(doc, f) for f in query["$or"])]
+
+
+def create_class_doc(name, docstring=""):
+    """Helper to create a ClassDocumentModel with minimal attributes."""
+    now = datetime.now()
+    return ClassDocumentModel(
+        name=name,
+        package="pkg.mod",
+        signature=f"class {name}",
+        type="class",
+        decorators=[],
+        embedding_vector=[0.0, 1.0],
+        member_variables=[],
+        docstring=docstring,
+        model="test-model",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def create_repository():
+    """Helper to create an EmbeddingRepository over fake collections, without a server."""
+    repo = EmbeddingRepository.__new__(EmbeddingRepository)
+    repo.classes = FakeCollection()
+    repo.functions = FakeCollection()
+    repo.quantize_int8 = False
+    return repo
+
+
+def test_store_embeddings_returns_stored_ids_of_existing_documents():
+    """Test that re-storing a document returns the _id kept in the collection, not a new one."""
+    repo = create_repository()
+
+    first = repo.store_embeddings({"classes": [create_class_doc("Foo")]}, model="test-model")
+    stored_id = repo.classes.docs[0]["_id"]
+    assert first == {"Foo": stored_id}
+
+    second = repo.store_embeddings(
+        {"classes": [create_class_doc("Foo", "updated"), create_class_doc("Bar")]}, model="test-model"
+    )
+    assert len(repo.classes.docs) == 2
+    assert repo.classes.docs[0]["docstring"] == "updated"
+    assert second == {"Foo": stored_id, "Bar": repo.classes.docs[1]["_id"]}
+
+
+def test_store_embeddings_replace_keeps_last_duplicate():
+    """Test that replace mode writes one document per key, keeping the last duplicate."""
+    repo = create_repository()
+    repo.store_embeddings({"classes": [create_class_doc("Foo", "old")]}, model="test-model")
+
+    last = create_class_doc("Foo", "setter")
+    stored = repo.store_embeddings(
+        {"classes": [create_class_doc("Foo", "getter"), last]}, model="test-model", mode="replace"
+    )
+    assert [doc["docstring"] for doc in repo.classes.docs] == ["setter"]
+    assert stored == {"Foo": last.id}
+
+
+def test_store_embeddings_rejects_unknown_mode():
+    """Test that an unsupported write mode raises instead of falling back to upsert."""
+    repo = create_repository()
+    with pytest.raises(ValueError):
+        repo.store_embeddings({"classes": [create_class_doc("Foo")]}, model="test-model", mode="insert")
+    assert repo.classes.docs == []
@@ -27,6 +27,19 @@ def test_module_node_creation(tmp_path):
     assert expected_module_id in visitor.graph_nodes
 
 
+def test_module_tree_kept_only_when_parsed_here(tmp_path):
+    # A tree parsed by the visitor is kept for reuse; a caller's own tree is not.
+    code = "'''Module docstring'''"
+    source_file = str(tmp_path / "dummy.py")
+
+    visitor = CodeVisitor(source_file=source_file, code=code, project_root=str(tmp_path))
+    assert isinstance(visitor.tree, ast.Module)
+
+    visitor = CodeVisitor(source_file=source_file, code=code, project_root=str(tmp_path), tree=ast.parse(code))
+    assert visitor.tree is None
+    assert visitor.graph_nodes[visitor.module_id].metadata.docstring == "Module docstring"
+
+
 def test_visit_class_definition(tmp_path):
     project_root = str(tmp_path)
     source_file = tmp_path / "dummy.py"
@@ -134,6 +147,34 @@ def caller():
     assert call_edges, "Caller function should have a 'calls' edge to my_function"
 
 
+def test_repeated_calls_and_imports_add_one_edge(tmp_path):
+    project_root = str(tmp_path)
+    source_file = tmp_path / "dummy.py"
+    code = """
+import os
+
+def my_function():
+    import os
+
+def caller():
+    my_function()
+    for _ in range(3):
+        my_function()
+"""
+    source_file.write_text(code)
+
+    visitor = CodeVisitor(source_file=str(source_file), code=code, project_root=project_root)
+    visitor.visit(ast.parse(code))
+
+    caller_node = visitor.graph_nodes["function:dummy.caller"]
+    call_edges = [edge for edge in caller_node.relationships if edge.target_node_id == "function:dummy.my_function"]
+    assert len(call_edges) == 1
+
+    module_node = visitor.graph_nodes[visitor.module_id]
+    import_edges = [edge for edge in module_node.relationships if edge.target_node_id == "module:os"]
+    assert len(import_edges) == 1
+
+
 def test_lookup_node(tmp_path):
     project_root = str(tmp_path)
     source_file = tmp_path / "dummy.py"